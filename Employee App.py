@@ -2,25 +2,33 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
 from vega_datasets import data
 from scipy.interpolate import make_interp_spline
 import matplotlib.pyplot as plt
-
-def load_data():
-    employee_df = pd.read_csv(r"Employee_Behaviour.csv")
-    return employee_df
-
-def load_autoencoder_model():
-    autoencoder = load_model(r"autoencoder_model.keras")
-    return autoencoder
-
-def validate_employee_behavior(employee_id, employee_df, autoencoder):
+import os
+from activity_matrix import BUSINESS_END, BUSINESS_START, HOURS
+from chart_cache import get_chart_cache
+from data_ingest import rejected_rows
+from drift_monitor import PSI_DRIFT, seconds_until_retrain_allowed, trigger_retrain
+from resources import get_resource_manager
+from tail_ingest import open_live_feed
+from scoring_engine import DATA_PATH, lookup_employee, top_risk
+from section_timing import section_stats, timed_section
+
+# Optional append-only CSV/JSONL feed of new behaviour records for live KPIs
+FEED_PATH = os.environ.get('BEHAVIOUR_FEED')
+
+def validate_employee_behavior(employee_id, scored_df, index, threshold, distribution=None):
     """
     Function to validate an employee's behavior based on reconstructed error 
     from an autoencoder model.
 
+    scored_df is the batch-scored population returned by score_population, index
+    its PopulationIndex and threshold the cached population threshold from
+    anomaly_threshold, so this is a lookup and a single comparison rather than a
+    model call. If the version's ErrorDistribution is given, the result also
+    carries the employee's percentile rank overall and within the department.
+
     Behavior_Label categories:
     - Suspicious:
         * Idle_Time: Higher than average but not excessive.
@@ -35,231 +43,53 @@ def validate_employee_behavior(employee_id, employee_df, autoencoder):
         * Work_Duration: Extremely short or excessively long hours without justification.
         * Latitude/Longitude: Geolocation inconsistent with approved areas or sudden location changes.
     """
-    features = ['Work_Duration', 'Idle_Time', 'File_Access_Frequency', 'VPN_Usage', 'Latitude', 'Longitude']
-    X = employee_df[features]
-
-    # Scale features
-    scaler = MinMaxScaler()
-    X_scaled = scaler.fit_transform(X)
-
-    # Filter data for specific employee
-    employee_data = employee_df[employee_df['Employee_ID'] == employee_id]
+    # Look up the employee's precomputed scores
+    employee_data = lookup_employee(scored_df, index, employee_id)
 
     # Handle case where employee data is not found
-    if employee_data.empty:
+    if employee_data is None:
         return None
 
-    # Scale features for the selected employee
-    employee_features = employee_data[features]
-    employee_scaled = scaler.transform(employee_features)
-
-    # Predict and calculate reconstruction error
-    reconstructed_employee = autoencoder.predict(employee_scaled)
-    mse = np.mean(np.power(employee_scaled - reconstructed_employee, 2), axis=1)
-    
-    # Calculate anomaly threshold
-    threshold = np.percentile(mse, 95)
-    anomaly_flag = mse > threshold
-
     # Extract behavior label
-    behavior_label = employee_data['Behavior_Label'].iloc[0]
+    behavior_label = employee_data['Behavior_Label']
 
     # Build result dictionary
     result = {
         'Employee_ID': employee_id,
-        'Department': employee_data['Department'].iloc[0],
-        'Role': employee_data['Role'].iloc[0],
+        'Department': employee_data['Department'],
+        'Role': employee_data['Role'],
         'Behavior_Label': behavior_label,
-        'Work_Duration': employee_data['Work_Duration'].iloc[0],
-        'Idle_Time': employee_data['Idle_Time'].iloc[0],
-        'File_Access_Frequency': employee_data['File_Access_Frequency'].iloc[0],
-        'VPN_Usage': employee_data['VPN_Usage'].iloc[0],
-        'Reconstruction_Error': mse[0],
-        'Is_Anomaly': bool(anomaly_flag[0]),
-        'Login_Timestamp': employee_data['Login_Timestamp'].iloc[0],
-        'Logout_Timestamp': employee_data['Logout_Timestamp'].iloc[0],
-        'Latitude': employee_data['Latitude'].iloc[0],
-        'Longitude': employee_data['Longitude'].iloc[0]
+        'Work_Duration': employee_data['Work_Duration'],
+        'Idle_Time': employee_data['Idle_Time'],
+        'File_Access_Frequency': employee_data['File_Access_Frequency'],
+        'VPN_Usage': employee_data['VPN_Usage'],
+        'Reconstruction_Error': employee_data['Reconstruction_Error'],
+        'Anomaly_Threshold': threshold,
+        'Is_Anomaly': bool(employee_data['Reconstruction_Error'] > threshold),
+        'Login_Timestamp': employee_data['Login_Timestamp'],
+        'Logout_Timestamp': employee_data['Logout_Timestamp'],
+        'Latitude': employee_data['Latitude'],
+        'Longitude': employee_data['Longitude']
     }
 
-    return result
-
-
-def create_peak_hours_chart(employee_data):
-    """
-    Create an enhanced peak hours activity chart with new theme colors and better aesthetics
-    """
-    # Data preparation
-    employee_data['Login_Timestamp'] = pd.to_datetime(employee_data['Login_Timestamp'])
-    employee_data['Logout_Timestamp'] = pd.to_datetime(employee_data['Logout_Timestamp'])
-    login_hour = employee_data['Login_Timestamp'].dt.hour.iloc[0]
-    logout_hour = employee_data['Logout_Timestamp'].dt.hour.iloc[0]
-
-    # Calculate activity data
-    hours_data = pd.DataFrame({
-        'Hour': range(24),
-        'Work_Activity': 0,
-        'Period': ['Off Hours'] * 24,
-        'Hour_Label': [(f'{i:02d}:00' if i < 12 else f'{i-12:02d}:00 PM' if i > 12 else '12:00 PM') for i in range(24)]
-    })
-    
-    work_duration = employee_data['Work_Duration'].iloc[0]
-
-    # Distribute work activity
-    if login_hour <= logout_hour:
-        hours_data.loc[login_hour:logout_hour, 'Work_Activity'] += work_duration / (logout_hour - login_hour + 1)
-        hours_data.loc[login_hour:logout_hour, 'Period'] = 'Working Hours'
-    else:
-        total_hours = 24 - login_hour + logout_hour + 1
-        hours_data.loc[login_hour:23, 'Work_Activity'] += work_duration / total_hours
-        hours_data.loc[0:logout_hour, 'Work_Activity'] += work_duration / total_hours
-        hours_data.loc[login_hour:23, 'Period'] = 'Working Hours'
-        hours_data.loc[0:logout_hour, 'Period'] = 'Working Hours'
-
-    # Create enhanced chart
-    base = alt.Chart(hours_data).encode(
-        x=alt.X('Hour:O',
-                axis=alt.Axis(
-                    title='Time of Day',
-                    labelAngle=0,
-                    titleFontSize=14,
-                    labelFontSize=12,
-                    titleFontWeight='bold',
-                    grid=False,
-                    domain=True,
-                    domainColor='#191970',
-                    tickColor='#191970'
-                ),
-                scale=alt.Scale(paddingInner=0.2)
-        ),
-        tooltip=[
-            alt.Tooltip('Hour_Label:N', title='Time'),
-            alt.Tooltip('Work_Activity:Q', title='Activity Level', format='.2f'),
-            alt.Tooltip('Period:N', title='Period')
-        ]
-    )
-
-    # Gradient background
-    area = base.mark_area(
-        opacity=0.2,
-        color='#191970'
-    ).encode(
-        y=alt.Y('Work_Activity:Q',
-                scale=alt.Scale(domain=[0, hours_data['Work_Activity'].max() * 1.2])),
-        color=alt.Color('Period:N',
-                       scale=alt.Scale(range=['#d2ebff', '#191970']),
-                       legend=None)
-    )
-
-    # Main activity line
-    line = base.mark_line(
-        strokeWidth=3,
-        color='#191970',
-        point=True,
-        interpolate='basis'
-    ).encode(
-        y=alt.Y('Work_Activity:Q',
-                axis=alt.Axis(
-                    title='Activity Level',
-                    titleFontSize=14,
-                    labelFontSize=12,
-                    titleFontWeight='bold',
-                    grid=True,
-                    gridColor='#d2ebff',
-                    gridWidth=0.5,
-                    domain=True,
-                    domainColor='#191970'
-                ))
-    )
-
-    # Interactive points
-    points = base.mark_circle(
-        size=100,
-        color='#191970',
-        opacity=0.6,
-        stroke='#ffffff',
-        strokeWidth=2
-    ).encode(
-        y='Work_Activity:Q'
-    ).add_selection(
-        alt.selection_single(
-            on='mouseover',
-            nearest=True,
-            empty='none',
-            clear='mouseout'
-        )
-    )
-
-    # Time markers
-    login_mark = alt.Chart(pd.DataFrame({
-        'Hour': [login_hour],
-        'Label': ['Login Time'],
-        'Hour_Label': [hours_data.iloc[login_hour]['Hour_Label']]
-    })).mark_rule(
-        color='#28a745',
-        strokeDash=[4, 4],
-        strokeWidth=2
-    ).encode(
-        x='Hour:O',
-        tooltip=[
-            alt.Tooltip('Label:N', title='Event'),
-            alt.Tooltip('Hour_Label:N', title='Time')
-        ]
-    )
-
-    logout_mark = alt.Chart(pd.DataFrame({
-        'Hour': [logout_hour],
-        'Label': ['Logout Time'],
-        'Hour_Label': [hours_data.iloc[logout_hour]['Hour_Label']]
-    })).mark_rule(
-        color='#dc3545',
-        strokeDash=[4, 4],
-        strokeWidth=2
-    ).encode(
-        x='Hour:O',
-        tooltip=[
-            alt.Tooltip('Label:N', title='Event'),
-            alt.Tooltip('Hour_Label:N', title='Time')
-        ]
-    )
-
-    # Combine layers
-    final_chart = (area + line + points + login_mark + logout_mark).properties(
-        title={
-            'text': 'Daily Activity Pattern',
-            'subtitle': ['Activity distribution throughout the day',
-                        'Green: Login time | Red: Logout time'],
-            'fontSize': 20,
-            'subtitleFontSize': 14,
-            'anchor': 'start',
-            'color': '#191970'
-        },
-        width=600,
-        height=400
-    ).configure_view(
-        strokeWidth=0
-    ).configure_axis(
-        domainColor='#191970',
-        tickColor='#191970',
-        labelColor='#191970',
-        titleColor='#191970'
-    ).configure_title(
-        color='#191970',
-        subtitleColor='#666666'
-    )
-
-    return final_chart
-
+    # Where the employee sits in the risk distribution (binary searches over presorted errors)
+    if distribution is not None:
+        result['Percentile_Rank'] = distribution.percentile_rank(employee_data['Reconstruction_Error'])
+        result['Department_Percentile_Rank'] = distribution.percentile_rank(
+            employee_data['Reconstruction_Error'], employee_data['Department'])
 
+    return result
 
 
-def create_behavior_comparison_chart(employee_data, department_data, features):
+def create_behavior_comparison_chart(employee_data, department_avg, features):
     """
     Create a grouped bar chart comparing employee metrics directly with department averages
+
+    department_avg maps each feature to its precomputed department mean, so the
+    chart never scans the department's rows.
     """
-    # Calculate department averages
-    department_avg = department_data[features].mean()
-    employee_values = employee_data[features].iloc[0]
+    # Numeric values only (VPN_Usage is a bool) so the inlined data has one column type
+    employee_values = employee_data[features].iloc[0].astype(float)
     
     # Create comparison dataframe in the desired format
     comparison_data = []
@@ -328,39 +158,20 @@ def create_behavior_comparison_chart(employee_data, department_data, features):
     
     return chart
 
-def create_peak_hours_chart(employee_data):
+def create_peak_hours_chart(hourly_activity, login_hour, logout_hour):
     """
     Create a new enhanced line graph showing peak hours activity
-    """
-    # Convert timestamps to datetime
-    employee_data['Login_Timestamp'] = pd.to_datetime(employee_data['Login_Timestamp'])
-    employee_data['Logout_Timestamp'] = pd.to_datetime(employee_data['Logout_Timestamp'])
 
-    # Extract login and logout hours
-    login_hour = employee_data['Login_Timestamp'].dt.hour.iloc[0]
-    logout_hour = employee_data['Logout_Timestamp'].dt.hour.iloc[0]
-
-    # Calculate work activity for each hour
+    hourly_activity is the employee's row of the precomputed ActivityProfile
+    matrix, so no per-employee distribution work happens here.
+    """
+    # Working hours run from login to logout, wrapping past midnight
+    working = (HOURS - login_hour) % 24 <= (logout_hour - login_hour) % 24
     hours_data = pd.DataFrame({
-        'Hour': range(24),
-        'Work_Activity': 0,
-        'Period': 'Off Hours'
+        'Hour': HOURS,
+        'Work_Activity': hourly_activity,
+        'Period': np.where(working, 'Working Hours', 'Off Hours')
     })
-    
-    work_duration = employee_data['Work_Duration'].iloc[0]
-
-    # Distribute work activity and mark working hours
-    if login_hour <= logout_hour:
-        active_hours = range(login_hour, logout_hour + 1)
-        hours_data.loc[login_hour:logout_hour, 'Work_Activity'] += work_duration / (logout_hour - login_hour + 1)
-        hours_data.loc[login_hour:logout_hour, 'Period'] = 'Working Hours'
-    else:
-        active_hours = list(range(login_hour, 24)) + list(range(0, logout_hour + 1))
-        total_hours = 24 - login_hour + logout_hour + 1
-        hours_data.loc[login_hour:23, 'Work_Activity'] += work_duration / total_hours
-        hours_data.loc[0:logout_hour, 'Work_Activity'] += work_duration / total_hours
-        hours_data.loc[login_hour:23, 'Period'] = 'Working Hours'
-        hours_data.loc[0:logout_hour, 'Period'] = 'Working Hours'
 
     # Create the multi-layer chart
     
@@ -455,6 +266,476 @@ def create_peak_hours_chart(employee_data):
 
     return final_chart
 
+def render_chart(chart_type, subject, version, build):
+    """
+    Draw a chart from the process-wide spec cache; build() only runs on a miss.
+    """
+    spec = get_chart_cache().get_or_build(chart_type, subject, version, build)
+    st.vega_lite_chart(spec=spec, use_container_width=True)
+
+
+def create_anomaly_donut(anomaly_rate):
+    """
+    Donut of the department's access-anomaly rate
+    """
+    # Anomaly Rate Donut Chart
+    anomaly_data = pd.DataFrame({
+        'Category': ['Anomaly', 'Normal'],
+        'Count': [anomaly_rate, 100 - anomaly_rate]
+    })
+    
+    donut = alt.Chart(anomaly_data).mark_arc(innerRadius=50).encode(
+        theta=alt.Theta(field="Count", type="quantitative"),
+        color=alt.Color(
+            field="Category",
+            type="nominal",
+            scale=alt.Scale(
+                domain=['Anomaly', 'Normal'],
+                range=['#191970', '#87CEFB']
+            )
+        )
+    ).properties(
+        title={
+            "text": f"Anomaly Rate: {anomaly_rate:.1f}%",
+            "color": "#191970",
+            "fontSize": 16
+        },
+        width=300,
+        height=300
+    )
+
+    return donut
+
+
+def create_behavior_donut(normal_count, suspicious_count, critical_count):
+    """
+    Donut of the department's behaviour label counts
+    """
+    # Behavior Distribution Chart
+    behavior_data = pd.DataFrame({
+        'Behavior': ['Normal', 'Suspicious', 'Critical'],
+        'Count': [
+            normal_count,
+            suspicious_count,
+            critical_count
+        ]
+    })
+    
+    behavior_chart = alt.Chart(behavior_data).mark_arc(innerRadius=50).encode(
+        theta=alt.Theta(field="Count", type="quantitative"),
+        color=alt.Color(
+            field="Behavior",
+            type="nominal",
+            scale=alt.Scale(
+                domain=['Normal', 'Suspicious', 'Critical'],
+                range=['#87CEFB', '#191970', '#4169E1']
+            )
+        )
+    ).properties(
+        title={
+            "text": "Behavior Distribution",
+            "color": "#191970",
+            "fontSize": 16
+        },
+        width=300,
+        height=300
+    )
+
+    return behavior_chart
+
+
+def create_role_breakdown_chart(cube, selected_department):
+    """
+    Behaviour labels per role in the selected department, read from the aggregate cube.
+    """
+    role_data = pd.DataFrame([
+        {'Role': role, 'Behavior': label, 'Count': cell['count']}
+        for role in cube.values['Role']
+        for label, cell in cube.breakdown('Behavior_Label', Department=selected_department, Role=role).items()
+    ])
+
+    return alt.Chart(role_data).mark_bar().encode(
+        x=alt.X('Count:Q', stack='zero', title='Employees'),
+        y=alt.Y('Role:N', title=None),
+        color=alt.Color('Behavior:N', scale=alt.Scale(
+            domain=['Normal', 'Suspicious', 'Critical'],
+            range=['#87CEFB', '#191970', '#4169E1']
+        )),
+        tooltip=['Role:N', 'Behavior:N', 'Count:Q']
+    ).properties(
+        title={
+            "text": "Behavior by Role",
+            "color": "#191970",
+            "fontSize": 16
+        },
+        height=200
+    )
+
+
+def create_department_heatmap(profile, selected_department):
+    """
+    Mean hourly activity for every department, with the selected one outlined.
+    """
+    heatmap_data = profile.department_frame()
+    heatmap_data['Off_Hours_Logins'] = heatmap_data['Department'].map(profile.department_off_hours_logins)
+
+    heatmap = alt.Chart(heatmap_data).mark_rect().encode(
+        x=alt.X('Hour:O', title='Hour of Day', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('Department:N', sort=list(profile.department_hourly), title=None),
+        color=alt.Color('Mean_Activity:Q', title='Mean Activity', scale=alt.Scale(range=['#ffffff', '#191970'])),
+        stroke=alt.condition(alt.datum.Department == selected_department, alt.value('#dc3545'), alt.value(None)),
+        tooltip=[
+            alt.Tooltip('Department:N'),
+            alt.Tooltip('Hour:O'),
+            alt.Tooltip('Mean_Activity:Q', title='Mean Activity', format='.2f'),
+            alt.Tooltip('Off_Hours_Logins:Q', title='Off-Hours Logins')
+        ]
+    ).properties(height=220)
+
+    return heatmap
+
+
+@st.fragment
+@timed_section('top_risk')
+def render_top_risk(scored_df, index, selected_department):
+    """
+    Ranking of the highest reconstruction errors, organisation-wide or for the
+    selected department, optionally narrowed to one role.
+    """
+    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>🏆 Highest-Risk Employees</h2>", unsafe_allow_html=True)
+    scope_col, role_col, k_col = st.columns(3)
+    scope = scope_col.radio('Scope', ['Organisation', selected_department], horizontal=True)
+    role = role_col.selectbox('Role', ['All Roles'] + index.role_names)
+    k = k_col.slider('Employees', min_value=5, max_value=50, value=10, step=5)
+
+    ranking = top_risk(
+        scored_df, index, k,
+        department=None if scope == 'Organisation' else selected_department,
+        role=None if role == 'All Roles' else role
+    )
+    st.dataframe(
+        ranking[['Employee_ID', 'Department', 'Role', 'Behavior_Label', 'Reconstruction_Error', 'Is_Anomaly']],
+        hide_index=True, use_container_width=True
+    )
+
+
+def create_drift_chart(report):
+    """
+    PSI per feature against the drift threshold.
+    """
+    bars = alt.Chart(report).mark_bar().encode(
+        x=alt.X('PSI:Q', title='Population Stability Index'),
+        y=alt.Y('Feature:N', sort=None, title=None),
+        color=alt.Color('Status:N', scale=alt.Scale(
+            domain=['stable', 'moderate', 'drift', 'warming up'],
+            range=['#87CEFB', '#4169E1', '#191970', '#d3d3d3']
+        ))
+    )
+    rule = alt.Chart(pd.DataFrame({'PSI': [PSI_DRIFT]})).mark_rule(color='red', strokeDash=[4, 4]).encode(x='PSI:Q')
+    return (bars + rule).properties(height=220)
+
+
+@st.fragment
+@timed_section('feature_drift')
+def render_drift_panel(drift, version, base_model, publish_dir):
+    """
+    PSI per input feature for the live window, with a button that starts a
+    background retraining job on the training data plus the feed. version is
+    the (data, model) version the feed was opened with; the job warm-starts
+    from base_model, the model currently being served, and publishes into
+    publish_dir, the directory the model registry watches. Without one the
+    button is disabled, since a retrained model would never be served.
+    """
+    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>🌊 Feature Drift</h2>", unsafe_allow_html=True)
+    report = drift.report()
+    drifted = report.loc[report['Status'] == 'drift', 'Feature'].tolist()
+    if drifted:
+        st.warning(f"Input drift detected in {', '.join(drifted)}; anomaly scores may be unreliable until the model is retrained.")
+    st.caption(f"Last {drift.window_rows} of {drift.rows_seen} feed rows compared with the training data")
+
+    render_chart('feature_drift', FEED_PATH, version + (drift.rows_seen,), lambda: create_drift_chart(report))
+    st.dataframe(report, hide_index=True, use_container_width=True)
+
+    wait = seconds_until_retrain_allowed()
+    if st.button('🔁 Retrain Model on Recent Data', disabled=wait > 0 or publish_dir is None):
+        inputs = [DATA_PATH] + ([FEED_PATH] if FEED_PATH.endswith('.csv') else [])
+        extra_args = ['--base-model', base_model]
+        # Values outside the training range need new min/max scaling
+        if report['Out_Of_Range'].max() > 0.01:
+            extra_args.append('--refit-scaler')
+        if trigger_retrain(inputs, publish_dir, extra_args):
+            st.success("Retraining started in the background; the new version is picked up when it is published.")
+    elif publish_dir is None:
+        st.caption("Set MODEL_DIR to the directory the dashboard should load published models from to enable retraining")
+    elif wait > 0:
+        st.caption(f"A retraining job was started recently; next one allowed in {wait / 60:.0f} min")
+
+
+@st.fragment
+@timed_section('department_overview')
+def render_department_overview(resources, live_feed, selected_department):
+    """
+    Department KPIs, donuts, role breakdown, status card and hourly heatmap.
+    Depends only on the snapshot, the live feed and the selected department.
+    """
+    # Calculate metrics
+    if live_feed is not None:
+        # Counters already include every row ingested from the feed
+        kpis = live_feed.kpis.get(selected_department)
+        total_employees = kpis['total']
+        anomaly_rate = kpis['anomaly_rate']
+        model_anomaly_count = kpis['model_anomalies']
+        normal_count = kpis['normal']
+        suspicious_count = kpis['suspicious']
+        critical_count = kpis['critical']
+    else:
+        # Every KPI is a lookup in the precomputed aggregate cube
+        cube = resources.cube
+        department_cell = cube.get(Department=selected_department)
+        total_employees = department_cell['count']
+        anomaly_count = cube.count(Department=selected_department, Access_Anomaly_Flag=1)
+        model_anomaly_count = department_cell['model_anomalies']
+        anomaly_rate = (anomaly_count / total_employees) * 100
+        normal_count = cube.count(Department=selected_department, Behavior_Label='Normal')
+        suspicious_count = cube.count(Department=selected_department, Behavior_Label='Suspicious')
+        critical_count = cube.count(Department=selected_department, Behavior_Label='Critical')
+    
+    # Create four columns for KPI cards
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # KPI Cards
+    with col1:
+        st.markdown(f"""
+            <div class='kpi-card'>
+                <div class='kpi-metric'>{total_employees}</div>
+                <div class='kpi-label'>Total Employees</div>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+            <div class='kpi-card'>
+                <div class='kpi-metric'>{suspicious_count}</div>
+                <div class='kpi-label'>Suspicious Activities</div>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+            <div class='kpi-card'>
+                <div class='kpi-metric'>{critical_count}</div>
+                <div class='kpi-label'>Critical Activities</div>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+            <div class='kpi-card'>
+                <div class='kpi-metric'>{model_anomaly_count}</div>
+                <div class='kpi-label'>Model-Flagged Anomalies</div>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    # Add spacing
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Department charts change with the data and model, and with every feed update
+    chart_version = (resources.data_version, resources.model_version)
+    if live_feed is not None:
+        chart_version += (live_feed.version,)
+
+    # Create two columns for charts
+    chart_col1, chart_col2 = st.columns(2)
+    
+    with chart_col1:
+        render_chart('anomaly_donut', selected_department, chart_version,
+                     lambda: create_anomaly_donut(anomaly_rate))
+    
+    with chart_col2:
+        render_chart('behavior_donut', selected_department, chart_version,
+                     lambda: create_behavior_donut(normal_count, suspicious_count, critical_count))
+    
+    # Drill down from the department to its roles
+    render_chart('role_breakdown', selected_department, (resources.data_version, resources.model_version),
+                 lambda: create_role_breakdown_chart(resources.cube, selected_department))
+
+    # Calculate and display overall department status
+    if critical_count > 0.2 * total_employees:
+        status = 'Poor'
+        status_color = '#191970'
+    elif suspicious_count > 0.1 * total_employees:
+        status = 'Neutral'
+        status_color = '#4169E1'
+    else:
+        status = 'Normal'
+        status_color = '#87CEFB'
+    
+    # Overall status card at the bottom
+    st.markdown(f"""
+        <div style="background-color:{status_color};padding:20px;border-radius:10px;text-align:center;color:white;font-size:24px;margin-top:25px;">
+            Overall Department Status: {status}
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Department-wide hourly activity, from the same precomputed matrix as the employee chart
+    activity = resources.activity
+    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>🕒 Hourly Activity by Department</h2>", unsafe_allow_html=True)
+    render_chart('department_heatmap', selected_department, resources.data_version,
+                 lambda: create_department_heatmap(activity, selected_department))
+    st.caption(f"Off-hours logins in {selected_department} (before {BUSINESS_START}:00 or from {BUSINESS_END}:00): "
+               f"{activity.department_off_hours_logins.get(selected_department, 0)}")
+
+
+@st.fragment
+@timed_section('employee_card')
+def render_employee_section(resources, selected_department, threshold):
+    """
+    Employee picker, alert, KPI cards and information card, followed by the
+    activity charts. Picking another employee reruns only this fragment.
+    """
+    scored_df = resources.scored_df
+    index = resources.index
+
+    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>👤 Employee Analysis</h2>", unsafe_allow_html=True)
+    employee_ids = index.department_rows(scored_df, selected_department)['Employee_ID'].unique().tolist()
+    selected_id = st.selectbox('Select Employee ID', employee_ids)
+
+    # Get employee data and validate behavior
+    employee_rows = index.employee_rows(scored_df, selected_id)
+    employee_data = employee_rows.iloc[0]
+    employee_behavior = validate_employee_behavior(selected_id, scored_df, index, threshold, resources.distribution)
+
+    # Session length from the pre-parsed timestamps
+    session_duration = (employee_data['Logout_Timestamp'] - employee_data['Login_Timestamp']).total_seconds() / 3600
+
+    # Behavior Alert
+    if employee_behavior:
+        behavior_label = employee_behavior['Behavior_Label']
+        alert_html = {
+            'Normal': '<div class="status-box normal">✅ Normal Behavior: All activities within expected patterns</div>',
+            'Suspicious': '<div class="status-box suspicious">⚠️ Suspicious Activity: Unusual patterns detected</div>',
+            'Critical': '<div class="status-box critical">🚨 Critical Alert: Confirmed irregular behavior</div>'
+        }
+        st.markdown(alert_html.get(behavior_label, ''), unsafe_allow_html=True)
+
+    # KPI Cards
+    st.markdown("""
+        <div class="kpi-container">
+            <div class="kpi-card">
+                <div class="kpi-title">Session Duration</div>
+                <div class="kpi-value">{:.2f} hrs</div>
+            </div>
+            <div class="kpi-card">
+                <div class="kpi-title">Idle Time</div>
+                <div class="kpi-value">{:.2f} hrs</div>
+            </div>
+            <div class="kpi-card">
+                <div class="kpi-title">File Access</div>
+                <div class="kpi-value">{}</div>
+            </div>
+        </div>
+    """.format(session_duration, employee_data['Idle_Time'], employee_data['File_Access_Frequency']), unsafe_allow_html=True)
+
+    # Employee Information Card
+    # Employee Information Card
+    st.markdown("""
+        <div class="employee-card">
+            <div class="employee-header">Employee Information</div>
+            <div class="employee-info">
+                <div class="info-item">
+                    <div class="info-label">Employee ID</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Department</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Role</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">VPN Usage</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Login Time</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Logout Time</div>
+                    <div class="info-value">{}</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Risk Percentile (Organisation)</div>
+                    <div class="info-value">{:.1f}%</div>
+                </div>
+                <div class="info-item">
+                    <div class="info-label">Risk Percentile (Department)</div>
+                    <div class="info-value">{:.1f}%</div>
+                </div>
+            </div>
+        </div>
+    """.format(
+        employee_data['Employee_ID'],
+        employee_data['Department'],
+        employee_data['Role'],
+        employee_data['VPN_Usage'],
+        employee_data['Login_Timestamp'].strftime('%I:%M %p'),  # 12-hour format with AM/PM
+        employee_data['Logout_Timestamp'].strftime('%I:%M %p'),  # 12-hour format with AM/PM
+        employee_behavior['Percentile_Rank'],
+        employee_behavior['Department_Percentile_Rank']
+    ), unsafe_allow_html=True)
+
+    render_activity_charts(resources, selected_id, employee_rows)
+
+
+@st.fragment
+@timed_section('activity_charts')
+def render_activity_charts(resources, selected_id, employee_rows):
+    """
+    Daily activity pattern and behaviour comparison for one employee.
+    """
+    activity = resources.activity
+    index = resources.index
+
+    # Activity Graphs
+    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>📈 Activity Analysis</h2>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.markdown('<div class="chart-title">Daily Activity Pattern</div>', unsafe_allow_html=True)
+        render_chart('peak_hours', selected_id, resources.data_version,
+                     lambda: create_peak_hours_chart(*activity.employee_hours(index.employee_position(selected_id))))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.markdown('<div class="chart-title">Employee Behaviour Metrics</div>', unsafe_allow_html=True)
+        comparison_features = ['Work_Duration', 'Idle_Time', 'File_Access_Frequency', 'VPN_Usage']
+        render_chart('behavior_comparison', selected_id, resources.data_version,
+                     lambda: create_behavior_comparison_chart(
+                         employee_rows,
+                         {feature: resources.cube.mean(feature, Department=employee_rows['Department'].iloc[0])
+                          for feature in comparison_features},
+                         comparison_features
+                     ))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_section_timings():
+    """
+    Server time per dashboard section, including fragment-only reruns.
+    """
+    with st.sidebar.expander('⏱ Server Time per Section'):
+        stats = section_stats()
+        if stats:
+            st.dataframe(pd.DataFrame(stats).T.round(1), use_container_width=True)
+
+
+@timed_section('full_rerun')
 def main():
     # Enhanced CSS with new color scheme
     st.markdown("""
@@ -637,22 +918,42 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
-    # Load data
-    employee_df = load_data()
-    autoencoder = load_autoencoder_model()
-
     # Sidebar with enhanced styling
     st.sidebar.markdown("""
         <div style='padding: 1rem 0;'>
             <h2 style='color: #191970; font-size: 1.5rem; font-weight: 600;'>🔍 Employee Analysis</h2>
         </div>
     """, unsafe_allow_html=True)
+
+    # Data, model, scores and indexes are shared by every session in this process
+    manager = get_resource_manager()
+    resources = manager.reload() if st.sidebar.button('🔄 Reload Data & Model') else manager.get()
+    autoencoder = resources.autoencoder
+    scaler = resources.scaler
+    scored_df = resources.scored_df
+    threshold = resources.threshold
+    index = resources.index
+
+    # Pull in anything appended to the live feed since the last rerun
+    live_feed = None
+    if FEED_PATH:
+        live_feed = open_live_feed(FEED_PATH, autoencoder, scaler, threshold, scored_df,
+                                   resources.data_version, resources.model_version)
+        live_feed.poll()
+        # The feed's threshold also covers everything ingested since startup
+        threshold = live_feed.threshold
     
-    departments = employee_df['Department'].unique()
+    # Surface rows the ingest schema could not parse
+    rejected = rejected_rows(DATA_PATH)
+    if len(rejected):
+        st.sidebar.warning(f"{len(rejected)} rows failed schema validation and were skipped")
+
+    chart_stats = get_chart_cache().stats()
+    st.sidebar.caption(f"Chart cache: {chart_stats['entries']}/{chart_stats['max_entries']} specs, "
+                       f"{chart_stats['hit_rate']:.0%} hit rate")
+
+    departments = index.department_names
     selected_department = st.sidebar.selectbox('Select Department', departments)
-    department_employees = employee_df[employee_df['Department'] == selected_department]
-    employee_ids = department_employees['Employee_ID'].unique()
-    selected_id = st.sidebar.selectbox('Select Employee ID', employee_ids)
     
     if st.sidebar.button('Department Analysis'):
     # Display the department analysis heading with custom styling
@@ -689,231 +990,19 @@ def main():
     
     st.markdown(f"<div class='department-header'><h2>📊 {selected_department} Department Analysis</h2></div>", unsafe_allow_html=True)
     
-    # Filter data for the selected department
-    department_data = employee_df[employee_df['Department'] == selected_department]
-    
-    # Calculate metrics
-    total_employees = len(department_data)
-    anomaly_count = department_data['Access_Anomaly_Flag'].sum()
-    anomaly_rate = (anomaly_count / total_employees) * 100
-    suspicious_count = len(department_data[department_data['Behavior_Label'] == 'Suspicious'])
-    critical_count = len(department_data[department_data['Behavior_Label'] == 'Critical'])
-    
-    # Create three columns for KPI cards
-    col1, col2, col3 = st.columns(3)
-    
-    # KPI Cards
-    with col1:
-        st.markdown(f"""
-            <div class='kpi-card'>
-                <div class='kpi-metric'>{total_employees}</div>
-                <div class='kpi-label'>Total Employees</div>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-            <div class='kpi-card'>
-                <div class='kpi-metric'>{suspicious_count}</div>
-                <div class='kpi-label'>Suspicious Activities</div>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-            <div class='kpi-card'>
-                <div class='kpi-metric'>{critical_count}</div>
-                <div class='kpi-label'>Critical Activities</div>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    # Add spacing
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    # Create two columns for charts
-    chart_col1, chart_col2 = st.columns(2)
-    
-    with chart_col1:
-        # Anomaly Rate Donut Chart
-        anomaly_data = pd.DataFrame({
-            'Category': ['Anomaly', 'Normal'],
-            'Count': [anomaly_rate, 100 - anomaly_rate]
-        })
-        
-        donut = alt.Chart(anomaly_data).mark_arc(innerRadius=50).encode(
-            theta=alt.Theta(field="Count", type="quantitative"),
-            color=alt.Color(
-                field="Category",
-                type="nominal",
-                scale=alt.Scale(
-                    domain=['Anomaly', 'Normal'],
-                    range=['#191970', '#87CEFB']
-                )
-            )
-        ).properties(
-            title={
-                "text": f"Anomaly Rate: {anomaly_rate:.1f}%",
-                "color": "#191970",
-                "fontSize": 16
-            },
-            width=300,
-            height=300
-        )
-        
-        st.altair_chart(donut, use_container_width=True)
-    
-    with chart_col2:
-        # Behavior Distribution Chart
-        behavior_data = pd.DataFrame({
-            'Behavior': ['Normal', 'Suspicious', 'Critical'],
-            'Count': [
-                len(department_data[department_data['Behavior_Label'] == 'Normal']),
-                suspicious_count,
-                critical_count
-            ]
-        })
-        
-        behavior_chart = alt.Chart(behavior_data).mark_arc(innerRadius=50).encode(
-            theta=alt.Theta(field="Count", type="quantitative"),
-            color=alt.Color(
-                field="Behavior",
-                type="nominal",
-                scale=alt.Scale(
-                    domain=['Normal', 'Suspicious', 'Critical'],
-                    range=['#87CEFB', '#191970', '#4169E1']
-                )
-            )
-        ).properties(
-            title={
-                "text": "Behavior Distribution",
-                "color": "#191970",
-                "fontSize": 16
-            },
-            width=300,
-            height=300
-        )
-        
-        st.altair_chart(behavior_chart, use_container_width=True)
-    
-    # Calculate and display overall department status
-    if critical_count > 0.2 * total_employees:
-        status = 'Poor'
-        status_color = '#191970'
-    elif suspicious_count > 0.1 * total_employees:
-        status = 'Neutral'
-        status_color = '#4169E1'
-    else:
-        status = 'Normal'
-        status_color = '#87CEFB'
-    
-    # Overall status card at the bottom
-    st.markdown(f"""
-        <div style="background-color:{status_color};padding:20px;border-radius:10px;text-align:center;color:white;font-size:24px;margin-top:25px;">
-            Overall Department Status: {status}
-        </div>
-    """, unsafe_allow_html=True)
+    render_department_overview(resources, live_feed, selected_department)
 
-    # Get employee data and validate behavior
-    employee_data = employee_df[employee_df['Employee_ID'] == selected_id].iloc[0]
-    employee_behavior = validate_employee_behavior(selected_id, employee_df, autoencoder)
-
-    # Convert timestamps
-    employee_data['Login_Timestamp'] = pd.to_datetime(employee_data['Login_Timestamp'])
-    employee_data['Logout_Timestamp'] = pd.to_datetime(employee_data['Logout_Timestamp'])
-    session_duration = (employee_data['Logout_Timestamp'] - employee_data['Login_Timestamp']).total_seconds() / 3600
+    render_top_risk(scored_df, index, selected_department)
 
-    # Behavior Alert
-    if employee_behavior:
-        behavior_label = employee_behavior['Behavior_Label']
-        alert_html = {
-            'Normal': '<div class="status-box normal">✅ Normal Behavior: All activities within expected patterns</div>',
-            'Suspicious': '<div class="status-box suspicious">⚠️ Suspicious Activity: Unusual patterns detected</div>',
-            'Critical': '<div class="status-box critical">🚨 Critical Alert: Confirmed irregular behavior</div>'
-        }
-        st.markdown(alert_html.get(behavior_label, ''), unsafe_allow_html=True)
-
-    # KPI Cards
-    st.markdown("""
-        <div class="kpi-container">
-            <div class="kpi-card">
-                <div class="kpi-title">Session Duration</div>
-                <div class="kpi-value">{:.2f} hrs</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-title">Idle Time</div>
-                <div class="kpi-value">{:.2f} hrs</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-title">File Access</div>
-                <div class="kpi-value">{}</div>
-            </div>
-        </div>
-    """.format(session_duration, employee_data['Idle_Time'], employee_data['File_Access_Frequency']), unsafe_allow_html=True)
+    # Feature drift of the live feed against the data the model was trained on
+    if live_feed is not None and live_feed.drift is not None:
+        render_drift_panel(live_feed.drift, (resources.data_version, resources.model_version), resources.model_path,
+                           manager.registry.model_dir)
 
-    # Employee Information Card
-    # Employee Information Card
-    st.markdown("""
-        <div class="employee-card">
-            <div class="employee-header">Employee Information</div>
-            <div class="employee-info">
-                <div class="info-item">
-                    <div class="info-label">Employee ID</div>
-                    <div class="info-value">{}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">Department</div>
-                    <div class="info-value">{}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">Role</div>
-                    <div class="info-value">{}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">VPN Usage</div>
-                    <div class="info-value">{}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">Login Time</div>
-                    <div class="info-value">{}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">Logout Time</div>
-                    <div class="info-value">{}</div>
-                </div>
-            </div>
-        </div>
-    """.format(
-        employee_data['Employee_ID'],
-        employee_data['Department'],
-        employee_data['Role'],
-        employee_data['VPN_Usage'],
-        employee_data['Login_Timestamp'].strftime('%I:%M %p'),  # 12-hour format with AM/PM
-        employee_data['Logout_Timestamp'].strftime('%I:%M %p')  # 12-hour format with AM/PM
-    ), unsafe_allow_html=True)
+    render_employee_section(resources, selected_department, threshold)
 
-    # Activity Graphs
-    st.markdown("<h2 style='color: #191970; margin-top: 2rem;'>📈 Activity Analysis</h2>", unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.markdown('<div class="chart-title">Daily Activity Pattern</div>', unsafe_allow_html=True)
-        peak_hours_chart = create_peak_hours_chart(employee_df[employee_df['Employee_ID'] == selected_id])
-        st.altair_chart(peak_hours_chart, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+    render_section_timings()
 
-    with col2:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.markdown('<div class="chart-title">Employee Behaviour Metrics</div>', unsafe_allow_html=True)
-        comparison_chart = create_behavior_comparison_chart(
-            employee_df[employee_df['Employee_ID'] == selected_id],
-            department_employees,
-            ['Work_Duration', 'Idle_Time', 'File_Access_Frequency', 'VPN_Usage']
-        )
-        st.altair_chart(comparison_chart, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
 
 if __name__ == "__main__":
     main()
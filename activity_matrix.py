@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from scoring_engine import LatestCache
+
+HOURS = np.arange(24)
+
+# Logins before BUSINESS_START or from BUSINESS_END on count as off-hours logins
+BUSINESS_START = 9
+BUSINESS_END = 17
+
+# Activity profiles keyed by data_version
+_profile_cache = LatestCache()
+
+
+def hourly_activity(login_hours, logout_hours, work_duration):
+    """
+    N x 24 float32 matrix spreading each employee's Work_Duration evenly over
+    the hours from login to logout (inclusive), wrapping past midnight.
+    """
+    login_hours = np.asarray(login_hours, dtype=np.int64)[:, None]
+    logout_hours = np.asarray(logout_hours, dtype=np.int64)[:, None]
+    # Hours covered, counting the login and logout hours themselves; 22:00 -> 02:00 covers 5
+    span = (logout_hours - login_hours) % 24 + 1
+    active = (HOURS - login_hours) % 24 < span
+    per_hour = np.asarray(work_duration, dtype=np.float32)[:, None] / span
+    return np.where(active, per_hour, 0).astype(np.float32)
+
+
+class ActivityProfile:
+    """
+    Hourly activity for every row of a scored, department-sorted frame,
+    computed in one vectorized pass. Per-employee charts are row lookups and
+    department aggregates are reductions over the department's row slice.
+    """
+
+    def __init__(self, scored, index):
+        self.login_hours = scored['Login_Timestamp'].dt.hour.to_numpy()
+        self.logout_hours = scored['Logout_Timestamp'].dt.hour.to_numpy()
+        self.matrix = hourly_activity(self.login_hours, self.logout_hours, scored['Work_Duration'].to_numpy())
+        self.off_hours_login = (self.login_hours < BUSINESS_START) | (self.login_hours >= BUSINESS_END)
+
+        slices = index.department_slices
+        self.department_hourly = {department: self.matrix[rows].mean(axis=0) for department, rows in slices.items()}
+        self.department_off_hours_logins = {department: int(self.off_hours_login[rows].sum())
+                                            for department, rows in slices.items()}
+
+    def employee_hours(self, position):
+        """
+        (24-hour activity vector, login hour, logout hour) for one row position.
+        """
+        return self.matrix[position], int(self.login_hours[position]), int(self.logout_hours[position])
+
+    def department_frame(self):
+        """
+        Long-form Department x Hour mean activity, ready for a heatmap.
+        """
+        departments = list(self.department_hourly)
+        return pd.DataFrame({
+            'Department': np.repeat(departments, 24),
+            'Hour': np.tile(HOURS, len(departments)),
+            'Mean_Activity': np.concatenate([self.department_hourly[d] for d in departments])
+        })
+
+
+def activity_profile(scored, index, data_version):
+    return _profile_cache.get_or_build(data_version, lambda: ActivityProfile(scored, index))
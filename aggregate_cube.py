@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+
+from scoring_engine import LatestCache
+
+DIMENSIONS = ['Department', 'Role', 'Behavior_Label', 'Access_Anomaly_Flag', 'Suspicious_Activity_Flag']
+
+MEASURES = ['count', 'model_anomalies']
+
+# Features summed per cell so any roll-up can report their mean
+SUMMED_FEATURES = ['Work_Duration', 'Idle_Time', 'File_Access_Frequency', 'VPN_Usage']
+
+# Cubes keyed by (data_version, model_version)
+_cube_cache = LatestCache()
+
+
+def _plain(value):
+    # NumPy scalars become Python ones so lookups with plain ints/strings match
+    return value.item() if hasattr(value, 'item') else value
+
+
+class AggregateCube:
+    """
+    Row counts, model-flagged anomaly counts and feature sums for every
+    combination of DIMENSIONS, including every roll-up.
+
+    The scored frame is grouped once; each group is then added to all 2**5
+    roll-ups it belongs to (None marks a rolled-up dimension), so any KPI is a
+    single dict lookup: cube.count(Department='HR', Behavior_Label='Critical').
+    """
+
+    def __init__(self, scored, dimensions=DIMENSIONS, summed_features=SUMMED_FEATURES):
+        self.dimensions = list(dimensions)
+        self.summed_features = list(summed_features)
+        grouped = scored.assign(**{feature: scored[feature].astype(np.float64) for feature in self.summed_features})\
+            .groupby(self.dimensions, observed=True, sort=False)\
+            .agg(count=('Employee_ID', 'size'), model_anomalies=('Is_Anomaly', 'sum'),
+                 **{feature: (feature, 'sum') for feature in self.summed_features})
+        totals = grouped[MEASURES + self.summed_features].to_numpy(dtype=np.float64)
+
+        self.values = {dimension: [] for dimension in self.dimensions}
+        self.cells = {}
+        for key, measures in zip(grouped.index, totals):
+            key = tuple(_plain(value) for value in key)
+            for dimension, value in zip(self.dimensions, key):
+                if value not in self.values[dimension]:
+                    self.values[dimension].append(value)
+            for keep in itertools.product((True, False), repeat=len(key)):
+                rolled = tuple(value if kept else None for value, kept in zip(key, keep))
+                cell = self.cells.get(rolled)
+                if cell is None:
+                    self.cells[rolled] = measures.copy()
+                else:
+                    cell += measures
+
+    def _key(self, filters):
+        unknown = set(filters) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions {sorted(unknown)}; expected some of {self.dimensions}")
+        return tuple(_plain(filters[dimension]) if dimension in filters else None for dimension in self.dimensions)
+
+    def get(self, **filters):
+        """
+        Measures for the cell matching filters; dimensions left out are rolled up.
+        """
+        cell = self.cells.get(self._key(filters))
+        if cell is None:
+            return dict.fromkeys(MEASURES, 0)
+        return {measure: int(value) for measure, value in zip(MEASURES, cell)}
+
+    def count(self, **filters):
+        return self.get(**filters)['count']
+
+    def mean(self, feature, **filters):
+        """
+        Mean of a summed feature over the filtered cell (NaN if the cell is empty).
+        """
+        cell = self.cells.get(self._key(filters))
+        if cell is None or not cell[0]:
+            return float('nan')
+        return float(cell[len(MEASURES) + self.summed_features.index(feature)] / cell[0])
+
+    def breakdown(self, dimension, **filters):
+        """
+        Drill down: measures for each value of dimension within the filtered cell.
+        """
+        return {value: self.get(**filters, **{dimension: value}) for value in self.values[dimension]}
+
+
+def aggregate_cube(scored, data_version, model_version):
+    return _cube_cache.get_or_build((data_version, model_version), lambda: AggregateCube(scored))
@@ -0,0 +1,187 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_ingest import parse_frame
+from numpy_inference import load_numpy_model
+from parallel_scoring import ParallelScorer
+from quantile_sketch import KLLSketch
+from quantization import PRECISIONS, quantize
+from scoring_engine import ANOMALY_PERCENTILE, load_scaler, reconstruction_error
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Without pyarrow results are streamed as CSV
+    pa = None
+
+# Rows parsed, scaled and scored at a time; peak memory is proportional to this
+CHUNK_SIZE = 100_000
+
+# Columns carried through to the scored output
+OUTPUT_COLUMNS = ['Employee_ID', 'Department', 'Role', 'Behavior_Label']
+
+
+class RunningAggregates:
+    """
+    Per-department row counts and error quantile sketches accumulated chunk by
+    chunk, so summaries and quantiles never need the full error array in memory.
+    """
+
+    def __init__(self):
+        self.sketches = {}
+        self.label_counts = {}
+        self.rows = 0
+        self.rejected = 0
+
+    def update(self, scored_chunk):
+        errors = scored_chunk['Reconstruction_Error'].to_numpy()
+        departments = scored_chunk['Department'].astype(str).to_numpy()
+
+        for department in np.unique(departments):
+            self.sketches.setdefault(department, KLLSketch()).update(errors[departments == department])
+
+        labels = scored_chunk.groupby([departments, scored_chunk['Behavior_Label'].astype(str).to_numpy()]).size()
+        for key, count in labels.items():
+            self.label_counts[key] = self.label_counts.get(key, 0) + int(count)
+
+        self.rows += len(scored_chunk)
+
+    def sketch(self, department=None):
+        if department is not None:
+            return self.sketches[department]
+        merged = KLLSketch()
+        for sketch in self.sketches.values():
+            merged.merge(sketch)
+        return merged
+
+    def quantile(self, q, department=None):
+        """
+        Approximate error value at quantile q (0-100).
+        """
+        return self.sketch(department).quantile(q)
+
+    def count_above(self, threshold, department=None):
+        """
+        Approximate number of rows with error above threshold.
+        """
+        sketch = self.sketch(department)
+        return int(round((1 - sketch.rank(threshold)) * sketch.count))
+
+    def department_summary(self, threshold):
+        """
+        One row per department: total rows, label counts and rows above threshold.
+        """
+        summary = []
+        for department in sorted(self.sketches):
+            summary.append({
+                'Department': department,
+                'Total': self.sketches[department].count,
+                'Normal': self.label_counts.get((department, 'Normal'), 0),
+                'Suspicious': self.label_counts.get((department, 'Suspicious'), 0),
+                'Critical': self.label_counts.get((department, 'Critical'), 0),
+                'Anomalies': self.count_above(threshold, department),
+                'Median_Error': self.quantile(50, department),
+                'P95_Error': self.quantile(95, department)
+            })
+        return pd.DataFrame(summary)
+
+
+class _ResultWriter:
+    """
+    Appends scored chunks to a Parquet file, or to CSV if pyarrow is missing
+    or the output path ends in .csv.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.use_parquet = pa is not None and not path.endswith('.csv')
+        self.writer = None
+        self.wrote_header = False
+
+    def write(self, frame):
+        if self.use_parquet:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            frame.to_csv(self.path, mode='a' if self.wrote_header else 'w', header=not self.wrote_header, index=False)
+            self.wrote_header = True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file_in_chunks(csv_path, output_path, autoencoder, scaler, chunk_size=CHUNK_SIZE, threshold=None,
+                         workers=1):
+    """
+    Score a behaviour export chunk by chunk and stream the results to output_path.
+
+    If threshold is given each row also gets an Is_Anomaly flag. With workers > 1
+    each chunk is scored by a shared-memory ParallelScorer running the exported
+    NumPy model instead of autoencoder. Returns the RunningAggregates collected
+    along the way.
+    """
+    aggregates = RunningAggregates()
+    writer = _ResultWriter(output_path)
+    scorer = ParallelScorer(workers, capacity=chunk_size) if workers > 1 else None
+    try:
+        reader = pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', keep_default_na=False, chunksize=chunk_size)
+        for raw_chunk in reader:
+            chunk, rejected = parse_frame(raw_chunk, csv_path)
+            aggregates.rejected += len(rejected)
+            if chunk.empty:
+                continue
+
+            if scorer:
+                # Scale straight into the pool's shared input buffer
+                scaler.transform_frame(chunk, out=scorer.input_view(len(chunk)))
+                errors = scorer.score_rows(len(chunk))
+            else:
+                errors = reconstruction_error(scaler.transform_frame(chunk), autoencoder)
+            scored = chunk[OUTPUT_COLUMNS].assign(Reconstruction_Error=errors)
+            if threshold is not None:
+                scored['Is_Anomaly'] = errors > threshold
+
+            aggregates.update(scored)
+            writer.write(scored)
+    finally:
+        writer.close()
+        if scorer is not None:
+            scorer.close()
+    return aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a behaviour export too large to load in one piece.")
+    parser.add_argument('input', help="CSV in Employee_Behaviour.csv format")
+    parser.add_argument('output', help="Parquet (or .csv) file for per-row scores")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help="Scoring processes per chunk")
+    parser.add_argument('--precision', choices=PRECISIONS, default='float32',
+                        help="Model precision. float32 is the fastest with this NumPy model; float16 and int8 "
+                             "score 3-4x slower and exist to check their accuracy (see python quantization.py)")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Fixed anomaly threshold; adds an Is_Anomaly column to the output")
+    parser.add_argument('--percentile', type=float, default=ANOMALY_PERCENTILE,
+                        help="Percentile used for the summary threshold when --threshold is not given")
+    args = parser.parse_args()
+    if args.workers > 1 and args.precision != 'float32':
+        parser.error("--precision is only supported with a single worker")
+
+    autoencoder = quantize(load_numpy_model(), args.precision)
+    aggregates = score_file_in_chunks(args.input, args.output, autoencoder, load_scaler(),
+                                      args.chunk_size, args.threshold, args.workers)
+    threshold = args.threshold if args.threshold is not None else aggregates.quantile(args.percentile)
+
+    print(f"Scored {aggregates.rows} rows ({aggregates.rejected} rejected) into {os.path.abspath(args.output)}")
+    print(f"Anomaly threshold: {threshold:.6f}")
+    print(aggregates.department_summary(threshold).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
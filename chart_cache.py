@@ -0,0 +1,98 @@
+import os
+import threading
+import warnings
+from collections import OrderedDict
+
+# Serialized chart specs kept per process; least recently used ones are dropped first
+CHART_CACHE_SIZE = int(os.environ.get('CHART_CACHE_SIZE', 512))
+
+# Hard cap on rows inlined into any one chart dataset; charts are expected to
+# aggregate server-side, so the browser payload does not grow with department size
+MAX_INLINE_ROWS = int(os.environ.get('CHART_MAX_ROWS', 1000))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ChartCache:
+    """
+    Bounded LRU of serialized Vega-Lite specs keyed by (chart type, subject, version).
+
+    get_or_build() only calls the Altair builder on a miss; a hit returns the
+    stored dict, so neither chart construction nor schema validation runs.
+    The version part of the key must change whenever the chart's data does.
+    Every spec goes through cap_inline_rows before it is stored.
+    """
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, chart_type, subject, version, build):
+        """
+        Spec for the key, calling build() (which returns an Altair chart) on a miss.
+        """
+        key = (chart_type, subject, version)
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+
+        # Build outside the lock so a slow chart does not block other sessions
+        spec = cap_inline_rows(build().to_dict(), chart_type)
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.max_entries:
+                self._specs.popitem(last=False)
+                self.evictions += 1
+        return spec
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._specs),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def cap_inline_rows(spec, chart_type, max_rows=MAX_INLINE_ROWS):
+    """
+    Truncate any inlined dataset of a spec to max_rows, warning that the chart
+    should be fed aggregated data instead.
+    """
+    datasets = spec.get('datasets', {})
+    for name, rows in datasets.items():
+        if len(rows) > max_rows:
+            warnings.warn(f"Chart {chart_type!r} inlines {len(rows)} rows; truncated to {max_rows}. "
+                          f"Aggregate its data server-side.")
+            datasets[name] = rows[:max_rows]
+    return spec
+
+
+def get_chart_cache():
+    """
+    The process-wide ChartCache shared by every Streamlit session.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ChartCache()
+    return _cache
@@ -0,0 +1,210 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from scoring_engine import DATA_PATH, file_sha256
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet cache is optional; fall back to the in-process memo only
+    pa = None
+
+CACHE_DIR = r".data_cache"
+
+# Day-first formats used by the behaviour exports
+TIMESTAMP_FORMAT = '%d-%m-%Y %H:%M'
+DATE_FORMAT = '%d-%m-%Y'
+
+# Declared column types: 'string', 'category', 'bool', a numpy dtype name, or ('datetime', format)
+SCHEMA = {
+    'Employee_ID': 'string',
+    'Department': 'category',
+    'Role': 'category',
+    'Login_Timestamp': ('datetime', TIMESTAMP_FORMAT),
+    'Logout_Timestamp': ('datetime', TIMESTAMP_FORMAT),
+    'File_Access_Timestamp': ('datetime', DATE_FORMAT),
+    'File_Access_Frequency': 'int16',
+    'Access_Anomaly_Flag': 'int8',
+    'Suspicious_Activity_Flag': 'int8',
+    'Work_Duration': 'float32',
+    'Idle_Time': 'int16',
+    'VPN_Usage': 'bool',
+    'Behavior_Label': 'category',
+    'Latitude': 'float32',
+    'Longitude': 'float32'
+}
+
+# Bump whenever SCHEMA changes so stale Parquet caches are rebuilt
+SCHEMA_VERSION = 1
+
+_BOOL_VALUES = {'TRUE': True, 'FALSE': False, '1': True, '0': False}
+
+# Key under which the source CSV signature is stored in the Parquet schema metadata
+_SIGNATURE_KEY = b'source_signature'
+
+# Parsed frames keyed by CSV path: (signature, frame, rejected rows)
+_frame_cache = {}
+
+
+def csv_signature(path):
+    """
+    Size and mtime of the CSV; the content hash is only computed when these disagree.
+    """
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'schema_version': SCHEMA_VERSION}
+
+
+def _same_file(cached, current, path):
+    if cached is None or cached['size'] != current['size']:
+        return False
+    if cached.get('schema_version') != current['schema_version']:
+        return False
+    if cached['mtime_ns'] == current['mtime_ns']:
+        return True
+    # Touched or copied but possibly unchanged: fall back to the content hash
+    current['sha256'] = current.get('sha256') or file_sha256(path)
+    return cached.get('sha256') == current['sha256']
+
+
+def cache_path(csv_path, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{name}.parquet")
+
+
+def _rejected_path(parquet_path):
+    return parquet_path.replace('.parquet', '.rejected.csv')
+
+
+def _read_parquet_cache(parquet_path, signature, csv_path):
+    if pa is None or not os.path.exists(parquet_path):
+        return None, None
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    cached = json.loads(metadata[_SIGNATURE_KEY]) if _SIGNATURE_KEY in metadata else None
+    if not _same_file(cached, signature, csv_path):
+        return None, None
+    rejected_path = _rejected_path(parquet_path)
+    rejected = pd.read_csv(rejected_path, dtype=str) if os.path.exists(rejected_path) else pd.DataFrame()
+    return pq.read_table(parquet_path).to_pandas(), rejected
+
+
+def _write_parquet_cache(employee_df, rejected, parquet_path, signature, csv_path):
+    if pa is None:
+        return
+    signature.setdefault('sha256', file_sha256(csv_path))
+    table = pa.Table.from_pandas(employee_df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_SIGNATURE_KEY] = json.dumps(signature).encode()
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+
+    # Write to a temp file first so a concurrent reader never sees a partial cache
+    tmp_path = parquet_path + '.tmp'
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+
+    rejected_path = _rejected_path(parquet_path)
+    if len(rejected):
+        rejected.to_csv(rejected_path, index=False)
+    elif os.path.exists(rejected_path):
+        os.remove(rejected_path)
+    os.replace(tmp_path, parquet_path)
+
+
+def _parse_column(raw, kind):
+    """
+    Convert one raw string column to its declared type. Unparseable values become NaN/NaT.
+    """
+    if isinstance(kind, tuple):
+        return pd.to_datetime(raw, format=kind[1], errors='coerce')
+    if kind == 'string':
+        return raw
+    if kind == 'category':
+        return raw.astype('category')
+    if kind == 'bool':
+        return raw.str.strip().str.upper().map(_BOOL_VALUES)
+
+    values = pd.to_numeric(raw, errors='coerce')
+    dtype = np.dtype(kind)
+    if dtype.kind in 'iu':
+        # Out-of-range or fractional values cannot be downcast safely
+        info = np.iinfo(dtype)
+        values = values.where((values >= info.min) & (values <= info.max) & (values % 1 == 0))
+    return values
+
+
+def parse_csv(csv_path, schema=SCHEMA):
+    """
+    Parse a behaviour export against the declared schema.
+
+    Returns (employee_df, rejected): the typed frame of valid rows and the raw
+    rows that failed to parse, with a Rejection_Reason column naming the bad fields.
+    """
+    raw = pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', keep_default_na=False)
+    return parse_frame(raw, csv_path, schema)
+
+
+def parse_frame(raw, source, schema=SCHEMA):
+    """
+    Apply the schema to a frame of raw strings; see parse_csv for the return value.
+    """
+    missing = [column for column in schema if column not in raw.columns]
+    if missing:
+        raise ValueError(f"{source} is missing columns: {missing}")
+
+    parsed = {}
+    bad_fields = pd.DataFrame(False, index=raw.index, columns=list(schema))
+    for column, kind in schema.items():
+        values = _parse_column(raw[column], kind)
+        bad_fields[column] = values.isna() | (raw[column].str.strip() == '')
+        parsed[column] = values
+
+    bad_rows = bad_fields.any(axis=1).to_numpy()
+    rejected = raw[bad_rows].copy()
+    rejected['Rejection_Reason'] = bad_fields[bad_rows].apply(
+        lambda row: ', '.join(row.index[row]), axis=1
+    ) if bad_rows.any() else pd.Series(dtype=str)
+
+    employee_df = pd.DataFrame(parsed)[~bad_rows].reset_index(drop=True)
+    for column, kind in schema.items():
+        if kind == 'category':
+            employee_df[column] = employee_df[column].cat.remove_unused_categories()
+        elif not isinstance(kind, tuple) and kind != 'string':
+            employee_df[column] = employee_df[column].astype(kind)
+
+    if len(rejected):
+        warnings.warn(f"{len(rejected)} rows of {source} failed schema validation and were skipped")
+    return employee_df, rejected.reset_index(drop=True)
+
+
+def load_employee_data(csv_path=DATA_PATH, cache_dir=CACHE_DIR):
+    """
+    Load the behaviour CSV, served from an in-process memo or a Parquet cache
+    whenever the CSV has not changed since it was last parsed.
+
+    The returned frame is typed according to SCHEMA, is shared between callers
+    and must be treated as read-only.
+    """
+    signature = csv_signature(csv_path)
+
+    memo = _frame_cache.get(csv_path)
+    if memo is not None and _same_file(memo[0], signature, csv_path):
+        return memo[1]
+
+    parquet_path = cache_path(csv_path, cache_dir)
+    employee_df, rejected = _read_parquet_cache(parquet_path, signature, csv_path)
+    if employee_df is None:
+        employee_df, rejected = parse_csv(csv_path)
+        _write_parquet_cache(employee_df, rejected, parquet_path, signature, csv_path)
+
+    _frame_cache[csv_path] = (signature, employee_df, rejected)
+    return employee_df
+
+
+def rejected_rows(csv_path=DATA_PATH):
+    """
+    Raw rows that failed schema validation on the last load of csv_path.
+    """
+    memo = _frame_cache.get(csv_path)
+    return memo[2] if memo is not None else pd.DataFrame()
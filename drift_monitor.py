@@ -0,0 +1,197 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from data_ingest import load_employee_data
+from scoring_engine import DATA_PATH, FEATURES, load_scaler
+
+# Equal-width bins over the training range of each (min-max scaled) feature;
+# one extra bin on each side catches values outside the range seen in training
+DRIFT_BINS = 20
+
+# Live rows compared against the baseline, kept as WINDOW_BLOCKS blocks so old rows can be dropped
+WINDOW_ROWS = int(os.environ.get('DRIFT_WINDOW_ROWS', 10_000))
+WINDOW_BLOCKS = 10
+
+# PSI rule of thumb: below 0.1 stable, 0.1-0.25 moderate shift, above 0.25 significant drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = float(os.environ.get('DRIFT_PSI_THRESHOLD', 0.25))
+
+# Live rows needed before drift is reported at all
+MIN_WINDOW_ROWS = 500
+
+# Minimum seconds between two retraining jobs started from the dashboard
+RETRAIN_COOLDOWN = float(os.environ.get('RETRAIN_COOLDOWN', 3600))
+
+# Smoothing for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+_RANGE_TOLERANCE = 1e-6
+
+_last_retrain = None
+
+
+def feature_histograms(X_scaled, bins=DRIFT_BINS):
+    """
+    Per-feature bin counts of a scaled feature matrix, shape (features, bins + 2).
+    """
+    X_scaled = np.asarray(X_scaled, dtype=np.float32)
+    columns = bins + 2
+    # The training maximum scales to 1.0 and belongs in the top bin, not the overflow bin;
+    # the tolerance absorbs float32 rounding in the scaler
+    positions = np.clip(np.floor(X_scaled * bins), 0, bins - 1).astype(np.int64) + 1
+    positions[X_scaled < -_RANGE_TOLERANCE] = 0
+    positions[X_scaled > 1 + _RANGE_TOLERANCE] = columns - 1
+    # One bincount for all features: offset every feature into its own block of bins
+    positions += np.arange(X_scaled.shape[1]) * columns
+    return np.bincount(positions.ravel(), minlength=X_scaled.shape[1] * columns)\
+        .reshape(X_scaled.shape[1], columns)
+
+
+def psi(expected, actual):
+    """
+    Population stability index per feature between two histogram arrays.
+    """
+    expected = np.maximum(expected / expected.sum(axis=1, keepdims=True), _EPSILON)
+    actual = np.maximum(actual / actual.sum(axis=1, keepdims=True), _EPSILON)
+    return np.sum((actual - expected) * np.log(actual / expected), axis=1)
+
+
+def ks_statistic(expected, actual):
+    """
+    Two-sample Kolmogorov-Smirnov statistic per feature, at histogram-bin resolution.
+    """
+    expected_cdf = np.cumsum(expected, axis=1) / expected.sum(axis=1, keepdims=True)
+    actual_cdf = np.cumsum(actual, axis=1) / actual.sum(axis=1, keepdims=True)
+    return np.max(np.abs(expected_cdf - actual_cdf), axis=1)
+
+
+class DriftMonitor:
+    """
+    Compares a rolling window of live feature values against the training baseline.
+
+    Only histograms are kept: the baseline counts and one count block per
+    slice of the window. update() bins the new rows and adjusts the running
+    window total, so each ingest batch costs O(rows + features * bins) no
+    matter how much data has been seen.
+    """
+
+    def __init__(self, baseline, window_rows=WINDOW_ROWS, blocks=WINDOW_BLOCKS, features=FEATURES):
+        self.baseline = baseline
+        self.features = list(features)
+        self.block_rows = max(1, window_rows // blocks)
+        self.blocks = deque()
+        self.max_blocks = blocks
+        self.current = np.zeros_like(baseline)
+        self.current_rows = 0
+        self.window = np.zeros_like(baseline)
+        self.window_rows = 0
+        self.rows_seen = 0
+
+    @classmethod
+    def from_frame(cls, employee_df, scaler, **kwargs):
+        return cls(feature_histograms(scaler.transform_frame(employee_df)), **kwargs)
+
+    def update(self, X_scaled):
+        """
+        Add a batch of scaled feature rows to the live window.
+        """
+        offset = 0
+        while offset < len(X_scaled):
+            # Fill the open block only up to block_rows, so a large batch spans several
+            # blocks and the window never holds much more than window_rows rows
+            piece = X_scaled[offset:offset + self.block_rows - self.current_rows]
+            offset += len(piece)
+            self._add(piece)
+        return self
+
+    def _add(self, X_scaled):
+        counts = feature_histograms(X_scaled)
+        self.current += counts
+        self.current_rows += len(X_scaled)
+        self.window += counts
+        self.window_rows += len(X_scaled)
+        self.rows_seen += len(X_scaled)
+
+        # Close the block once it is full and drop the oldest ones beyond the window
+        if self.current_rows >= self.block_rows:
+            self.blocks.append((self.current, self.current_rows))
+            self.current = np.zeros_like(self.baseline)
+            self.current_rows = 0
+            while len(self.blocks) > self.max_blocks:
+                old_counts, old_rows = self.blocks.popleft()
+                self.window -= old_counts
+                self.window_rows -= old_rows
+
+    def report(self):
+        """
+        One row per feature with PSI, KS and a stable/moderate/drift status.
+        """
+        if not self.window_rows:
+            psi_values = ks_values = np.full(len(self.features), np.nan)
+        else:
+            psi_values = psi(self.baseline, self.window)
+            ks_values = ks_statistic(self.baseline, self.window)
+        status = np.where(psi_values > PSI_DRIFT, 'drift', np.where(psi_values > PSI_MODERATE, 'moderate', 'stable'))
+        if self.window_rows < MIN_WINDOW_ROWS:
+            status = np.full(len(self.features), 'warming up')
+        # Share of live rows outside the training range, which the model has never seen
+        out_of_range = (self.window[:, 0] + self.window[:, -1]) / max(self.window_rows, 1)
+        return pd.DataFrame({
+            'Feature': self.features,
+            'PSI': psi_values,
+            'KS': ks_values,
+            'Out_Of_Range': out_of_range,
+            'Status': status
+        })
+
+    def drifted(self):
+        report = self.report()
+        return report.loc[report['Status'] == 'drift', 'Feature'].tolist()
+
+
+def trigger_retrain(inputs, publish_dir, extra_args=()):
+    """
+    Start train_autoencoder.py as a detached background job publishing into
+    publish_dir, at most once per RETRAIN_COOLDOWN seconds. Returns True if a job was started.
+    """
+    global _last_retrain
+    if _last_retrain is not None and time.time() - _last_retrain < RETRAIN_COOLDOWN:
+        return False
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'train_autoencoder.py')
+    subprocess.run([sys.executable, script, *inputs, *extra_args, '--publish-dir', publish_dir, '--detach'],
+                   check=True)
+    _last_retrain = time.time()
+    return True
+
+
+def seconds_until_retrain_allowed():
+    if _last_retrain is None:
+        return 0.0
+    return max(0.0, RETRAIN_COOLDOWN - (time.time() - _last_retrain))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature drift of a behaviour export against the training data.")
+    parser.add_argument('live', help="CSV in Employee_Behaviour.csv format")
+    parser.add_argument('--baseline', default=DATA_PATH, help="Training CSV")
+    parser.add_argument('--batch-rows', type=int, default=1_000, help="Rows fed to the monitor per update")
+    args = parser.parse_args()
+
+    scaler = load_scaler()
+    monitor = DriftMonitor.from_frame(load_employee_data(args.baseline), scaler)
+    X_live = scaler.transform_frame(load_employee_data(args.live))
+    start = time.perf_counter()
+    for offset in range(0, len(X_live), args.batch_rows):
+        monitor.update(X_live[offset:offset + args.batch_rows])
+    elapsed = time.perf_counter() - start
+
+    print(monitor.report().to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    print(f"{len(X_live)} rows in {-(-len(X_live) // args.batch_rows)} updates: "
+          f"{elapsed / max(len(X_live), 1) * 1e6:.2f} us/row; window holds {monitor.window_rows} rows")
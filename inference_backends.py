@@ -0,0 +1,307 @@
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+
+from numpy_inference import load_numpy_model
+from scoring_engine import FEATURES, MODEL_PATH, PREDICT_BATCH_SIZE, file_sha256
+
+# Registered backends by name, in registration order
+BACKENDS = {}
+
+
+def register_backend(cls):
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def _derived_path(model_path, extension):
+    return os.path.splitext(model_path)[0] + extension
+
+
+def _is_current(artifact_path, model_path):
+    """
+    True if artifact_path was derived from the current contents of model_path.
+    """
+    stamp = artifact_path + '.sha256'
+    if not (os.path.exists(artifact_path) and os.path.exists(stamp)):
+        return False
+    with open(stamp) as f:
+        return f.read().strip() == file_sha256(model_path)
+
+
+def _stamp(artifact_path, model_path):
+    with open(artifact_path + '.sha256', 'w') as f:
+        f.write(file_sha256(model_path))
+
+
+class Backend:
+    """
+    An inference runtime for autoencoder_model.keras.
+
+    load() returns an object with the Keras-style predict(X, batch_size=None,
+    verbose=0) method, converting the model into the runtime's format first
+    if needed.
+    """
+
+    name = None
+    requires = []
+
+    @classmethod
+    def available(cls):
+        return all(_installed(module) for module in cls.requires)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH):
+        raise NotImplementedError
+
+
+@register_backend
+class NumpyBackend(Backend):
+    name = 'numpy'
+    requires = ['numpy']
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH):
+        return load_numpy_model(model_path, _derived_path(model_path, '.npz'))
+
+
+@register_backend
+class KerasBackend(Backend):
+    name = 'keras'
+    requires = ['tensorflow']
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH):
+        from tensorflow.keras.models import load_model
+        return load_model(model_path)
+
+
+class _OnnxModel:
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def predict(self, X, batch_size=None, verbose=0):
+        return self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})[0]
+
+
+@register_backend
+class OnnxRuntimeBackend(Backend):
+    """
+    Builds an ONNX graph (MatMul/Add/activation per Dense layer) from the
+    exported NumPy weights, so no TensorFlow-to-ONNX converter is needed.
+    """
+
+    name = 'onnxruntime'
+    requires = ['onnx', 'onnxruntime']
+
+    _ONNX_OPS = {'relu': 'Relu', 'sigmoid': 'Sigmoid', 'tanh': 'Tanh', 'linear': 'Identity'}
+
+    @classmethod
+    def export(cls, model_path, onnx_path):
+        import onnx
+        from onnx import TensorProto, helper, numpy_helper
+
+        model = NumpyBackend.load(model_path)
+        nodes, initializers = [], []
+        current = 'input'
+        for i, (kernel, bias, activation) in enumerate(zip(model.kernels, model.biases, model.activations)):
+            initializers += [numpy_helper.from_array(kernel, f'kernel_{i}'), numpy_helper.from_array(bias, f'bias_{i}')]
+            nodes += [
+                helper.make_node('MatMul', [current, f'kernel_{i}'], [f'matmul_{i}']),
+                helper.make_node('Add', [f'matmul_{i}', f'bias_{i}'], [f'dense_{i}']),
+                helper.make_node(cls._ONNX_OPS[activation], [f'dense_{i}'], [f'activation_{i}'])
+            ]
+            current = f'activation_{i}'
+
+        graph = helper.make_graph(
+            nodes, 'autoencoder',
+            [helper.make_tensor_value_info('input', TensorProto.FLOAT, [None, len(FEATURES)])],
+            [helper.make_tensor_value_info(current, TensorProto.FLOAT, [None, model.kernels[-1].shape[1]])],
+            initializers
+        )
+        # IR version 8 / opset 13 loads on every onnxruntime release from 1.10 on
+        onnx_model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)], ir_version=8)
+        onnx.checker.check_model(onnx_model)
+        onnx.save(onnx_model, onnx_path)
+        _stamp(onnx_path, model_path)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, precision='float32'):
+        """
+        precision='int8' runs a dynamically quantized copy (int8 weights, MatMulInteger).
+        """
+        import onnxruntime as ort
+
+        onnx_path = _derived_path(model_path, '.onnx')
+        if not _is_current(onnx_path, model_path):
+            cls.export(model_path, onnx_path)
+        if precision == 'int8':
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            int8_path = _derived_path(model_path, '.int8.onnx')
+            if not _is_current(int8_path, model_path):
+                quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+                _stamp(int8_path, model_path)
+            onnx_path = int8_path
+        elif precision != 'float32':
+            raise ValueError(f"Unsupported onnxruntime precision {precision!r}")
+        return _OnnxModel(ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']))
+
+
+class _TFLiteModel:
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.input_index = interpreter.get_input_details()[0]['index']
+        self.output_index = interpreter.get_output_details()[0]['index']
+        self.batch_rows = 0
+
+    def predict(self, X, batch_size=None, verbose=0):
+        X = np.asarray(X, dtype=np.float32)
+        # The interpreter has a fixed input shape; only resize when the batch size changes
+        if len(X) != self.batch_rows:
+            self.interpreter.resize_tensor_input(self.input_index, X.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_rows = len(X)
+        self.interpreter.set_tensor(self.input_index, X)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+@register_backend
+class TFLiteBackend(Backend):
+    """
+    Runs a .tflite conversion of the model. Converting needs TensorFlow;
+    running only needs tflite_runtime (or TensorFlow).
+    """
+
+    name = 'tflite'
+    requires = []
+
+    @classmethod
+    def available(cls):
+        return _installed('tflite_runtime') or _installed('tensorflow')
+
+    @classmethod
+    def export(cls, model_path, tflite_path, precision='float32'):
+        import tensorflow as tf
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(model_path))
+        if precision != 'float32':
+            # Post-training quantization: int8 weights with dynamic-range kernels, or float16 weights
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            if precision == 'float16':
+                converter.target_spec.supported_types = [tf.float16]
+        with open(tflite_path, 'wb') as f:
+            f.write(converter.convert())
+        _stamp(tflite_path, model_path)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, precision='float32'):
+        """
+        precision='float16' or 'int8' runs a post-training quantized conversion.
+        """
+        if precision not in ('float32', 'float16', 'int8'):
+            raise ValueError(f"Unsupported tflite precision {precision!r}")
+        tflite_path = _derived_path(model_path, '.tflite' if precision == 'float32' else f'.{precision}.tflite')
+        if not _is_current(tflite_path, model_path):
+            cls.export(model_path, tflite_path, precision)
+        if _installed('tflite_runtime'):
+            from tflite_runtime.interpreter import Interpreter
+        else:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        return _TFLiteModel(Interpreter(model_path=tflite_path))
+
+
+def available_backends():
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def resolve_backend(preference):
+    """
+    First available backend from a comma-separated preference list, e.g. 'onnxruntime,numpy'.
+    """
+    for name in (part.strip() for part in preference.split(',')):
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown inference backend {name!r}; registered: {list(BACKENDS)}")
+        if BACKENDS[name].available():
+            return BACKENDS[name]
+    raise RuntimeError(f"None of the inference backends {preference!r} are installed")
+
+
+def load_backend_model(preference, model_path=MODEL_PATH):
+    return resolve_backend(preference).load(model_path)
+
+
+def conformance(model_path=MODEL_PATH, rows=10_000, atol=1e-5):
+    """
+    Run every available backend on the same inputs and compare with the NumPy
+    reference. Returns {backend: max abs difference}; raises ValueError above atol.
+    """
+    X = np.random.default_rng(0).random((rows, len(FEATURES)), dtype=np.float32)
+    expected = NumpyBackend.load(model_path).predict(X)
+    differences = {}
+    for name in available_backends():
+        actual = BACKENDS[name].load(model_path).predict(X, batch_size=PREDICT_BATCH_SIZE, verbose=0)
+        differences[name] = float(np.max(np.abs(actual - expected)))
+    failures = {name: diff for name, diff in differences.items() if diff > atol}
+    if failures:
+        raise ValueError(f"Backends deviate from the NumPy reference beyond {atol}: {failures}")
+    return differences
+
+
+def microbenchmark(model_path=MODEL_PATH, single_calls=1_000, batch_rows=1_000_000):
+    """
+    Single-row latency (p50/p99 ms) and large-batch throughput (rows/s) per available backend.
+    """
+    rng = np.random.default_rng(0)
+    rows = rng.random((single_calls, len(FEATURES)), dtype=np.float32)
+    batch = rng.random((batch_rows, len(FEATURES)), dtype=np.float32)
+    results = {}
+    for name in available_backends():
+        model = BACKENDS[name].load(model_path)
+        model.predict(rows[:1], verbose=0)  # warm up
+
+        latencies = []
+        for i in range(single_calls):
+            start = time.perf_counter()
+            model.predict(rows[i:i + 1], verbose=0)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        model.predict(batch, batch_size=PREDICT_BATCH_SIZE, verbose=0)
+        throughput = batch_rows / (time.perf_counter() - start)
+
+        results[name] = {
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'rows_per_second': throughput
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inference backend conformance test and microbenchmark.")
+    parser.add_argument('command', choices=['list', 'conformance', 'bench'])
+    parser.add_argument('--single-calls', type=int, default=1_000)
+    parser.add_argument('--batch-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, backend in BACKENDS.items():
+            print(f"{name:>12}: {'available' if backend.available() else 'not installed'}")
+    elif args.command == 'conformance':
+        for name, diff in conformance().items():
+            print(f"{name:>12}: max abs difference vs numpy {diff:.2e}")
+    else:
+        print(f"{'backend':>12} {'p50 ms':>8} {'p99 ms':>8} {'rows/s':>14}")
+        for name, row in microbenchmark(single_calls=args.single_calls, batch_rows=args.batch_rows).items():
+            print(f"{name:>12} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['rows_per_second']:>14,.0f}")
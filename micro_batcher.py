@@ -0,0 +1,187 @@
+import argparse
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from scoring_engine import FEATURES, MODEL_PATH
+
+# Defaults: coalesce up to 64 rows, waiting at most 2 ms after the first arrives
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+
+# Latency samples kept for the p50/p99 metrics
+METRICS_WINDOW = 10_000
+
+
+class MicroBatcher:
+    """
+    Shared scoring queue that coalesces concurrent single-row requests into one
+    forward pass.
+
+    Callers block in score() while a background thread collects requests that
+    arrive within max_wait_ms of the first one (up to max_batch_size rows), runs
+    the model once and hands each caller its own reconstruction error.
+    """
+
+    def __init__(self, autoencoder, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 metrics_window=METRICS_WINDOW):
+        self.autoencoder = autoencoder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=metrics_window)
+        self._batch_sizes = deque(maxlen=metrics_window)
+        self._metrics_lock = threading.Lock()
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, x_scaled):
+        """
+        Queue one scaled feature row. Returns a Future resolving to its reconstruction error.
+
+        Raises ValueError for a row that is not one value per feature, and
+        RuntimeError once the batcher has been closed.
+        """
+        future = Future()
+        row = np.asarray(x_scaled, dtype=np.float32).reshape(-1)
+        # Checked here so a malformed row fails only its own caller, not the whole batch
+        if row.size != len(FEATURES):
+            raise ValueError(f"Expected {len(FEATURES)} scaled feature values, got {row.size}")
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed MicroBatcher")
+            self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def score(self, x_scaled, timeout=None):
+        return self.submit(x_scaled).result(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then let _run see the shutdown signal
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            # Drop requests whose caller cancelled the future while it was queued
+            batch = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            futures = [future for _, future, _ in batch]
+            try:
+                X = np.vstack([row for row, _, _ in batch])
+                reconstructed = self.autoencoder.predict(X, batch_size=len(X), verbose=0)
+                errors = np.mean(np.power(X - reconstructed, 2), axis=1)
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+
+            for future, error in zip(futures, errors):
+                future.set_result(float(error))
+
+            done = time.perf_counter()
+            with self._metrics_lock:
+                self._latencies.extend(done - submitted for _, _, submitted in batch)
+                self._batch_sizes.append(len(batch))
+
+    def stats(self):
+        """
+        Latency percentiles (ms) and batch sizes over the recent metrics window.
+        """
+        with self._metrics_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+        if not len(latencies):
+            return {'requests': 0, 'batches': 0, 'mean_batch_size': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0}
+        return {
+            'requests': len(latencies),
+            'batches': len(batch_sizes),
+            'mean_batch_size': float(batch_sizes.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99))
+        }
+
+    def close(self):
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+
+def _simulate(score_one, clients, requests_per_client):
+    """
+    Fire requests from concurrent client threads; returns (elapsed seconds, per-request latencies in ms).
+    """
+    rng = np.random.default_rng(0)
+    rows = rng.random((clients * requests_per_client, len(FEATURES)), dtype=np.float32)
+
+    def client(offset):
+        latencies = []
+        for row in rows[offset:offset + requests_per_client]:
+            start = time.perf_counter()
+            score_one(row)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        latencies = sum(pool.map(client, range(0, len(rows), requests_per_client)), [])
+    return time.perf_counter() - start, np.array(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-request predict calls with micro-batched scoring.")
+    parser.add_argument('--backend', choices=['numpy', 'keras'], default='keras')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=100, help="Requests per client")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    if args.backend == 'keras':
+        from tensorflow.keras.models import load_model
+        model = load_model(MODEL_PATH)
+    else:
+        from numpy_inference import load_numpy_model
+        model = load_numpy_model()
+
+    # Keras models are not safe to call from many threads at once, so the direct path is serialized
+    predict_lock = threading.Lock()
+
+    def direct(row):
+        with predict_lock:
+            X = row.reshape(1, -1)
+            return float(np.mean(np.power(X - model.predict(X, verbose=0), 2)))
+
+    batcher = MicroBatcher(model, args.max_batch_size, args.max_wait_ms)
+    total = args.clients * args.requests
+    for name, score_one in (('direct', direct), ('micro-batched', batcher.score)):
+        elapsed, latencies = _simulate(score_one, args.clients, args.requests)
+        print(f"{name:>14}: {total / elapsed:10,.0f} req/s  "
+              f"p50 {np.percentile(latencies, 50):7.2f} ms  p99 {np.percentile(latencies, 99):7.2f} ms")
+    print(f"batcher stats: {batcher.stats()}")
+    batcher.close()
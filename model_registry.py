@@ -0,0 +1,130 @@
+import os
+import threading
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from inference_backends import load_backend_model
+from scoring_engine import FEATURES, MODEL_PATH, SCALER_PATH, file_version, load_scaler
+
+# Comma-separated preference list of inference backends (numpy, keras, onnxruntime, tflite);
+# the first one installed is used
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'numpy')
+
+# Optional directory of published versions: <MODEL_DIR>/<version>/autoencoder_model.keras
+MODEL_DIR = os.environ.get('MODEL_DIR')
+
+# Seconds between checks for a newly published model
+POLL_INTERVAL = float(os.environ.get('MODEL_POLL_INTERVAL', 10))
+
+# A loaded, warmed-up model together with the scaler it was trained with
+ModelVersion = namedtuple('ModelVersion', ['version', 'model_path', 'autoencoder', 'scaler'])
+
+
+def load_autoencoder(model_path=MODEL_PATH, backend=INFERENCE_BACKEND):
+    return load_backend_model(backend, model_path)
+
+
+def latest_published_model(model_dir):
+    """
+    Model path inside the highest-sorting version directory, or None if nothing is published.
+    """
+    versions = sorted(
+        name for name in os.listdir(model_dir)
+        # Dot-prefixed directories are publishes still being written
+        if not name.startswith('.') and os.path.isfile(os.path.join(model_dir, name, os.path.basename(MODEL_PATH)))
+    )
+    return os.path.join(model_dir, versions[-1], os.path.basename(MODEL_PATH)) if versions else None
+
+
+class ModelRegistry:
+    """
+    Watches the model file (or a directory of published versions) and swaps
+    in new models without a restart.
+
+    A new model is loaded and warmed up on the watcher thread, then published
+    with a single attribute assignment. Callers that already hold a
+    ModelVersion keep scoring with it, and listeners are told about the swap
+    so scores cached under the old version can be rebuilt.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, model_dir=MODEL_DIR, backend=INFERENCE_BACKEND,
+                 poll_interval=POLL_INTERVAL):
+        self.model_path = model_path
+        self.model_dir = model_dir
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._current = self._load(self._resolve_path())
+
+    def _resolve_path(self):
+        if self.model_dir:
+            return latest_published_model(self.model_dir) or self.model_path
+        return self.model_path
+
+    def _scaler_path(self, model_path):
+        return os.path.join(os.path.dirname(model_path), os.path.basename(SCALER_PATH))
+
+    def _version(self, model_path):
+        # The scaler is part of the version so a scaler written after the model still triggers a reload
+        return f"{os.path.dirname(model_path) or '.'}:{file_version(model_path)}:" \
+               f"{file_version(self._scaler_path(model_path))}"
+
+    def _load(self, model_path):
+        version = self._version(model_path)
+        autoencoder = load_autoencoder(model_path, self.backend)
+        scaler = load_scaler(self._scaler_path(model_path), model_path)
+
+        # Warm up so the first real request does not pay for lazy initialisation
+        autoencoder.predict(np.zeros((32, len(FEATURES)), dtype=np.float32), verbose=0)
+        return ModelVersion(version, model_path, autoencoder, scaler)
+
+    def current(self):
+        return self._current
+
+    def add_listener(self, callback):
+        """
+        Register callback(new_version, old_version), called on the watcher thread after each swap.
+        """
+        self._listeners.append(callback)
+
+    def check(self, force=False):
+        """
+        Load and swap in the model if it changed on disk. Returns True if a swap happened.
+        """
+        with self._lock:
+            model_path = self._resolve_path()
+            old = self._current
+            try:
+                if not force and self._version(model_path) == old.version:
+                    return False
+                new = self._load(model_path)
+            except Exception as exc:
+                # Likely a publish in progress; keep serving the old model and retry next poll
+                warnings.warn(f"Could not load {model_path}, keeping version {old.version}: {exc}")
+                return False
+            self._current = new
+
+        for callback in self._listeners:
+            callback(new, old)
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
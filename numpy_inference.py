@@ -0,0 +1,148 @@
+import io
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+
+from scoring_engine import MODEL_PATH, file_sha256
+
+NUMPY_MODEL_PATH = r"autoencoder_model.npz"
+
+# Activations the NumPy forward pass knows how to evaluate
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'sigmoid': lambda x: 0.5 * (1.0 + np.tanh(0.5 * x)),
+    'tanh': np.tanh
+}
+
+
+def _weights_key(class_name, seen):
+    """
+    Name Keras 3 gives a layer inside model.weights.h5: snake_case class name
+    with a per-class counter (dense, dense_1, ...), independent of config names.
+    """
+    base = ''.join('_' + c.lower() if c.isupper() else c for c in class_name).lstrip('_')
+    count = seen.get(base, 0)
+    seen[base] = count + 1
+    return base if count == 0 else f"{base}_{count}"
+
+
+def export_keras_archive(keras_path=MODEL_PATH, npz_path=NUMPY_MODEL_PATH):
+    """
+    Pull the Dense layer weights and activations out of a .keras archive and
+    write them to an .npz file that numpy alone can load.
+
+    Only plain stacks of Dense layers are supported; anything else raises ValueError.
+    """
+    import h5py
+
+    with zipfile.ZipFile(keras_path) as archive:
+        config = json.loads(archive.read('config.json'))
+        weights_h5 = h5py.File(io.BytesIO(archive.read('model.weights.h5')), 'r')
+
+    arrays = {}
+    activations = []
+    seen = {}
+    previous = None
+    for layer in config['config']['layers']:
+        key = _weights_key(layer['class_name'], seen)
+        if layer['class_name'] == 'InputLayer':
+            previous = layer['name']
+            continue
+        if layer['class_name'] != 'Dense':
+            raise ValueError(f"Unsupported layer type for NumPy inference: {layer['class_name']}")
+
+        # Refuse anything that is not a straight chain
+        inbound = [arg['config']['keras_history'][0] for node in layer['inbound_nodes'] for arg in node['args']]
+        if inbound != [previous]:
+            raise ValueError(f"Layer {layer['name']} is not fed by {previous}; only sequential stacks are supported")
+        previous = layer['name']
+
+        activation = layer['config']['activation']
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation for NumPy inference: {activation}")
+
+        index = len(activations)
+        variables = weights_h5['layers'][key]['vars']
+        arrays[f'kernel_{index}'] = np.asarray(variables['0'], dtype=np.float32)
+        arrays[f'bias_{index}'] = (np.asarray(variables['1'], dtype=np.float32) if layer['config']['use_bias']
+                                   else np.zeros(layer['config']['units'], dtype=np.float32))
+        activations.append(activation)
+
+    weights_h5.close()
+
+    meta = {'activations': activations, 'model_sha256': file_sha256(keras_path)}
+    np.savez(npz_path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+class NumpyAutoencoder:
+    """
+    Pure-NumPy forward pass over exported Dense layers.
+
+    predict mirrors the Keras signature so it can stand in for the Keras model.
+    """
+
+    def __init__(self, kernels, biases, activations, model_sha256=None):
+        self.kernels = kernels
+        self.biases = biases
+        self.activations = activations
+        self.model_sha256 = model_sha256
+
+    @classmethod
+    def load(cls, npz_path=NUMPY_MODEL_PATH):
+        with np.load(npz_path) as f:
+            meta = json.loads(str(f['meta']))
+            layers = len(meta['activations'])
+            kernels = [f[f'kernel_{i}'] for i in range(layers)]
+            biases = [f[f'bias_{i}'] for i in range(layers)]
+        return cls(kernels, biases, meta['activations'], meta['model_sha256'])
+
+    def predict(self, X, batch_size=None, verbose=0):
+        out = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            out = ACTIVATIONS[activation](out @ kernel + bias)
+        return out
+
+
+def load_numpy_model(keras_path=MODEL_PATH, npz_path=NUMPY_MODEL_PATH):
+    """
+    Load the NumPy model, re-exporting it first if it is missing or was
+    exported from a different .keras file.
+    """
+    if os.path.exists(npz_path):
+        model = NumpyAutoencoder.load(npz_path)
+        if model.model_sha256 == file_sha256(keras_path):
+            return model
+    export_keras_archive(keras_path, npz_path)
+    return NumpyAutoencoder.load(npz_path)
+
+
+def verify_against_keras(keras_path=MODEL_PATH, npz_path=NUMPY_MODEL_PATH, rows=10000, atol=1e-5):
+    """
+    Compare NumPy and Keras outputs on random inputs in the scaled [0, 1] range.
+    Returns the largest absolute difference; raises ValueError above atol.
+    """
+    from tensorflow.keras.models import load_model
+
+    X = np.random.default_rng(0).random((rows, 6), dtype=np.float32)
+    expected = load_model(keras_path).predict(X, verbose=0)
+    actual = load_numpy_model(keras_path, npz_path).predict(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if max_diff > atol:
+        raise ValueError(f"NumPy output deviates from Keras by {max_diff} (tolerance {atol})")
+    return max_diff
+
+
+if __name__ == "__main__":
+    # Usage: python numpy_inference.py export|verify
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    if command == 'export':
+        export_keras_archive()
+        print(f"Wrote {NUMPY_MODEL_PATH} from {MODEL_PATH}")
+    elif command == 'verify':
+        print(f"Max abs difference vs Keras: {verify_against_keras():.2e}")
+    else:
+        sys.exit("usage: python numpy_inference.py export|verify")
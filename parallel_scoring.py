@@ -0,0 +1,152 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from numpy_inference import NUMPY_MODEL_PATH, NumpyAutoencoder, load_numpy_model
+from quantile_sketch import KLLSketch
+from scoring_engine import FEATURES, MODEL_PATH
+
+# Slices handed out per worker; a few per worker keeps the pool balanced
+SLICES_PER_WORKER = 4
+
+# Per-process state set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(input_name, output_name, capacity, npz_path):
+    # Workers only attach; the parent creates and unlinks the segments
+    input_shm = SharedMemory(name=input_name)
+    output_shm = SharedMemory(name=output_name)
+    _worker['shm'] = (input_shm, output_shm)
+    _worker['X'] = np.ndarray((capacity, len(FEATURES)), dtype=np.float32, buffer=input_shm.buf)
+    _worker['errors'] = np.ndarray((capacity,), dtype=np.float32, buffer=output_shm.buf)
+    _worker['model'] = NumpyAutoencoder.load(npz_path)
+
+
+def _score_slice(start, stop, sketch):
+    X = _worker['X'][start:stop]
+    reconstructed = _worker['model'].predict(X)
+    errors = np.mean(np.power(X - reconstructed, 2), axis=1)
+    _worker['errors'][start:stop] = errors
+    # A sketch of a slice is a few KB, so it is cheap to send back for merging
+    return KLLSketch().update(errors) if sketch else None
+
+
+class ParallelScorer:
+    """
+    Process pool that scores a scaled float32 feature matrix held in shared memory.
+
+    Workers load the NumPy model once and write reconstruction errors for
+    disjoint row slices straight into a shared output array, so no DataFrames
+    or arrays are pickled per call. Callers that can write the scaled matrix
+    into input_view(rows) themselves, then call score_rows(rows), skip the
+    copy into shared memory as well. Use as a context manager.
+    """
+
+    def __init__(self, workers=None, capacity=1_000_000, npz_path=NUMPY_MODEL_PATH):
+        self.workers = workers or os.cpu_count()
+        self.npz_path = npz_path
+        self.capacity = 0
+        self.pool = None
+        self._input_shm = None
+        self._output_shm = None
+
+        # Make sure the exported weights exist before workers try to load them
+        load_numpy_model(MODEL_PATH, npz_path)
+        self._start(capacity)
+
+    def _start(self, capacity):
+        self.close()
+        self.capacity = capacity
+        self._input_shm = SharedMemory(create=True, size=capacity * len(FEATURES) * 4)
+        self._output_shm = SharedMemory(create=True, size=capacity * 4)
+        self._X = np.ndarray((capacity, len(FEATURES)), dtype=np.float32, buffer=self._input_shm.buf)
+        self._errors = np.ndarray((capacity,), dtype=np.float32, buffer=self._output_shm.buf)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._input_shm.name, self._output_shm.name, capacity, self.npz_path)
+        )
+
+    def input_view(self, rows):
+        """
+        Writable view of the first rows of the shared input matrix, growing it if needed.
+        """
+        if rows > self.capacity:
+            self._start(rows)
+        return self._X[:rows]
+
+    def score(self, X_scaled, sketch=None):
+        """
+        Reconstruction error for every row of X_scaled, computed across the pool.
+        If a KLLSketch is given, each worker sketches its slice and the results
+        are merged into it.
+        """
+        self.input_view(len(X_scaled))[:] = X_scaled
+        return self.score_rows(len(X_scaled), sketch)
+
+    def score_rows(self, rows, sketch=None):
+        """
+        Like score(), for rows already written into input_view(rows).
+        """
+        bounds = np.linspace(0, rows, self.workers * SLICES_PER_WORKER + 1, dtype=np.int64)
+        futures = [self.pool.submit(_score_slice, int(start), int(stop), sketch is not None)
+                   for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        for future in futures:
+            slice_sketch = future.result()
+            if sketch is not None:
+                sketch.merge(slice_sketch)
+        return self._errors[:rows].copy()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for shm in (self._input_shm, self._output_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._input_shm = self._output_shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(rows, worker_counts, repeats=3):
+    """
+    Time ParallelScorer on a synthetic scaled matrix for each worker count.
+    Returns a list of (workers, seconds, rows_per_second, speedup).
+    """
+    results = []
+    for workers in worker_counts:
+        with ParallelScorer(workers, capacity=rows) as scorer:
+            # Generated in place, so the timing covers only the parallel scoring
+            np.random.default_rng(0).random(out=scorer.input_view(rows), dtype=np.float32)
+            scorer.score_rows(workers * SLICES_PER_WORKER)  # warm up the pool
+            best = min(_timed(scorer.score_rows, rows) for _ in range(repeats))
+        results.append((workers, best, rows / best, results[0][1] / best if results else 1.0))
+    return results
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shared-memory parallel scoring.")
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>14} {'speedup':>8}")
+    for workers, seconds, throughput, speedup in benchmark(args.rows, args.workers):
+        print(f"{workers:>8} {seconds:>9.3f} {throughput:>14,.0f} {speedup:>8.2f}")
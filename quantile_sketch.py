@@ -0,0 +1,111 @@
+import numpy as np
+
+# Top-level compactor size; rank error is roughly 1.7 / SKETCH_K of the stream length
+SKETCH_K = 512
+
+# Each lower level gets this fraction of the capacity of the level above it
+_CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch in the style of KLL (Karnin, Lang, Liberty).
+
+    Values are kept in a stack of compactors; an item at level h stands for
+    2**h original values. When a level overflows it is sorted and every other
+    item (random offset) is promoted to the next level, so memory stays
+    O(k) regardless of how many values are added. Two sketches built on
+    different streams (or processes; sketches pickle) can be merged into one.
+    The default fixed seed makes thresholds reproducible between runs.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved exactly
+                keep = items[:1] if len(items) % 2 else items[:0]
+                paired = items[len(keep):]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def update(self, values):
+        """
+        Add a batch (or a single value) to the sketch.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one in place.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self._compress()
+        return self
+
+    def copy(self):
+        clone = KLLSketch(self.k)
+        clone.count = self.count
+        clone.levels = [items.copy() for items in self.levels]
+        return clone
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Approximate value at percentile q (0-100).
+        """
+        if not self.count:
+            return float('nan')
+        values, cumulative = self._weighted()
+        target = q / 100 * cumulative[-1]
+        return float(values[min(np.searchsorted(cumulative, target, side='left'), len(values) - 1)])
+
+    def rank(self, value):
+        """
+        Approximate fraction of added values that are <= value.
+        """
+        if not self.count:
+            return float('nan')
+        values, cumulative = self._weighted()
+        position = np.searchsorted(values, value, side='right')
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def retained(self):
+        return sum(len(items) for items in self.levels)
@@ -0,0 +1,183 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from data_ingest import load_employee_data
+from inference_backends import BACKENDS
+from numpy_inference import ACTIVATIONS
+from scoring_engine import ANOMALY_PERCENTILE, DATA_PATH, MODEL_PATH, load_scaler
+
+PRECISIONS = ['float32', 'float16', 'int8']
+
+# Quantized builds of the runtime backends compared in the report, when the runtime is installed
+RUNTIME_VARIANTS = [('onnxruntime', 'float32'), ('onnxruntime', 'int8'),
+                    ('tflite', 'float32'), ('tflite', 'float16'), ('tflite', 'int8')]
+
+
+class Float16Autoencoder:
+    """
+    The NumPy autoencoder with weights and activations rounded to float16.
+
+    NumPy has no float16 matrix multiply (it would loop in Python-speed C
+    code), so the rounded values are multiplied in float32: the accuracy is
+    that of float16 storage, the speed that of the float32 path.
+    """
+
+    def __init__(self, base):
+        self.kernels = [kernel.astype(np.float16) for kernel in base.kernels]
+        self.biases = [bias.astype(np.float16) for bias in base.biases]
+        self.activations = base.activations
+        self._gemm_kernels = [kernel.astype(np.float32) for kernel in self.kernels]
+        self._gemm_biases = [bias.astype(np.float32) for bias in self.biases]
+
+    def predict(self, X, batch_size=None, verbose=0):
+        out = np.asarray(X, dtype=np.float16).astype(np.float32)
+        for kernel, bias, activation in zip(self._gemm_kernels, self._gemm_biases, self.activations):
+            out = ACTIVATIONS[activation](out @ kernel + bias).astype(np.float16).astype(np.float32)
+        return out
+
+
+class Int8Autoencoder:
+    """
+    Dynamically quantized autoencoder: int8 weights (symmetric, per output unit)
+    and int8 activations (symmetric, per row), rescaled to float32 before the
+    bias and activation.
+
+    The integer products are summed in float32 so the GEMM runs on BLAS; with
+    int8 operands and a handful of inputs per unit the sums stay far below
+    2**24 and are exact, as an int32 accumulator would be.
+    """
+
+    def __init__(self, base):
+        self.kernels = []
+        self.kernel_scales = []
+        for kernel in base.kernels:
+            scale = np.abs(kernel).max(axis=0) / 127
+            scale[scale == 0] = 1.0
+            self.kernels.append(np.round(kernel / scale).astype(np.int8))
+            self.kernel_scales.append(scale.astype(np.float32))
+        self.biases = base.biases
+        self.activations = base.activations
+        self._gemm_kernels = [kernel.astype(np.float32) for kernel in self.kernels]
+
+    def predict(self, X, batch_size=None, verbose=0):
+        out = np.asarray(X, dtype=np.float32)
+        for kernel, kernel_scale, bias, activation in zip(self._gemm_kernels, self.kernel_scales, self.biases,
+                                                          self.activations):
+            row_scale = np.abs(out).max(axis=1, keepdims=True) / 127
+            row_scale[row_scale == 0] = 1.0
+            # Integer-valued (-127..127) float32, the int8 activations without an int8 array
+            quantized = np.round(out / row_scale)
+            out = ACTIVATIONS[activation]((quantized @ kernel) * (row_scale * kernel_scale) + bias)
+        return out.astype(np.float32, copy=False)
+
+
+def quantize(model, precision):
+    """
+    Wrap a NumpyAutoencoder in the requested precision ('float32' returns it unchanged).
+    """
+    if precision == 'float32':
+        return model
+    if precision == 'float16':
+        return Float16Autoencoder(model)
+    if precision == 'int8':
+        return Int8Autoencoder(model)
+    raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}")
+
+
+def weight_bytes(model):
+    return sum(array.nbytes for array in model.kernels + model.biases + getattr(model, 'kernel_scales', []))
+
+
+def _errors(model, X_scaled):
+    return np.mean(np.power(X_scaled - model.predict(X_scaled), 2), axis=1)
+
+
+def _peak_scoring_bytes(model, X_scaled):
+    # NumPy reports its buffers to tracemalloc, so the peak covers every intermediate array
+    tracemalloc.start()
+    try:
+        _errors(model, X_scaled)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _throughput(model, X, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def _variants(reference, model_path):
+    for precision in PRECISIONS:
+        yield 'numpy', precision, quantize(reference, precision)
+    for backend, precision in RUNTIME_VARIANTS:
+        if BACKENDS[backend].available():
+            yield backend, precision, BACKENDS[backend].load(model_path, precision)
+
+
+def comparison_report(csv_path=DATA_PATH, percentile=ANOMALY_PERCENTILE, benchmark_rows=1_000_000,
+                      model_path=MODEL_PATH):
+    """
+    Compare every precision (the NumPy variants, plus quantized ONNX Runtime
+    and TFLite builds where installed) against NumPy float32 on a behaviour
+    export: error agreement, anomaly-flag agreement at the configured
+    percentile threshold, throughput on benchmark_rows tiled rows, weight
+    memory and peak working memory while scoring the export. The two memory
+    figures are NumPy-only (None for runtimes, whose buffers tracemalloc cannot see).
+    """
+    X_scaled = load_scaler().transform_frame(load_employee_data(csv_path))
+    X_bench = np.resize(X_scaled, (benchmark_rows, X_scaled.shape[1]))
+    reference = BACKENDS['numpy'].load(model_path)
+
+    reference_errors = _errors(reference, X_scaled)
+    threshold = np.percentile(reference_errors, percentile)
+    reference_flags = reference_errors > threshold
+    reference_throughput = _throughput(reference, X_bench)
+
+    report = []
+    for backend, precision, model in _variants(reference, model_path):
+        numpy_model = backend == 'numpy'
+        errors = _errors(model, X_scaled)
+        flags = errors > threshold
+        throughput = _throughput(model, X_bench)
+        report.append({
+            'backend': backend,
+            'precision': precision,
+            'max_abs_error_diff': float(np.max(np.abs(errors - reference_errors))),
+            'error_correlation': float(np.corrcoef(errors, reference_errors)[0, 1]),
+            'flag_agreement': float(np.mean(flags == reference_flags)),
+            'flags_missed': int(np.sum(reference_flags & ~flags)),
+            'flags_added': int(np.sum(flags & ~reference_flags)),
+            'rows_per_second': throughput,
+            'speedup': throughput / reference_throughput,
+            'weight_bytes': weight_bytes(model) if numpy_model else None,
+            'peak_scoring_bytes': _peak_scoring_bytes(model, X_scaled) if numpy_model else None
+        })
+    return threshold, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy/latency report for reduced-precision autoencoders.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--percentile', type=float, default=ANOMALY_PERCENTILE)
+    parser.add_argument('--benchmark-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    threshold, report = comparison_report(args.data, args.percentile, args.benchmark_rows)
+    print(f"Threshold (float32, p{args.percentile:g}): {threshold:.6f}")
+    print(f"{'backend':>11} {'precision':>9} {'max|dErr|':>10} {'corr':>8} {'flag agr':>9} {'missed':>7} {'added':>6} "
+          f"{'rows/s':>13} {'speedup':>8} {'weights':>8} {'peak mem':>10}")
+    for row in report:
+        weights = '-' if row['weight_bytes'] is None else f"{row['weight_bytes']}B"
+        peak = '-' if row['peak_scoring_bytes'] is None else f"{row['peak_scoring_bytes'] / 1024:,.0f}KB"
+        print(f"{row['backend']:>11} {row['precision']:>9} {row['max_abs_error_diff']:>10.2e} "
+              f"{row['error_correlation']:>8.5f} {row['flag_agreement']:>9.2%} {row['flags_missed']:>7} "
+              f"{row['flags_added']:>6} {row['rows_per_second']:>13,.0f} {row['speedup']:>8.2f} "
+              f"{weights:>8} {peak:>10}")
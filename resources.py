@@ -0,0 +1,99 @@
+import threading
+from collections import namedtuple
+
+from activity_matrix import activity_profile
+from aggregate_cube import aggregate_cube
+from data_ingest import load_employee_data
+from model_registry import ModelRegistry
+from scoring_engine import (DATA_PATH, anomaly_threshold, error_distribution, file_version, population_index,
+                            score_population)
+
+# One immutable, read-only snapshot of everything the dashboard needs
+Resources = namedtuple('Resources', [
+    'data_version', 'model_version', 'model_path', 'employee_df', 'autoencoder', 'scaler',
+    'scored_df', 'threshold', 'index', 'distribution', 'activity', 'cube'
+])
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+class ResourceManager:
+    """
+    Holds one shared Resources snapshot per server process.
+
+    get() returns the current snapshot and rebuilds it when the data file
+    changes. Model changes are picked up by the ModelRegistry in the
+    background: the new model is warmed up and rescored off the request path,
+    and sessions keep the old snapshot until the new one is swapped in.
+    reload() forces a rebuild of both. Snapshots are replaced, never mutated.
+    """
+
+    def __init__(self, data_path=DATA_PATH, registry=None):
+        self.data_path = data_path
+        self.registry = registry or ModelRegistry()
+        self._current = None
+        self._lock = threading.Lock()
+        self.registry.add_listener(self._on_model_swap)
+
+    def _build(self, data_version, model):
+        employee_df = load_employee_data(self.data_path)
+        scored_df = score_population(employee_df, model.autoencoder, model.scaler, data_version, model.version)
+        threshold = anomaly_threshold(scored_df['Reconstruction_Error'], data_version, model.version)
+        index = population_index(scored_df, data_version)
+        distribution = error_distribution(scored_df, index, data_version, model.version)
+        activity = activity_profile(scored_df, index, data_version)
+        cube = aggregate_cube(scored_df, data_version, model.version)
+        return Resources(data_version, model.version, model.model_path, employee_df, model.autoencoder, model.scaler,
+                         scored_df, threshold, index, distribution, activity, cube)
+
+    def _on_model_swap(self, new_model, old_model):
+        # Rescore on the registry's thread, then publish the snapshot in one assignment
+        with self._lock:
+            self._current = self._build(file_version(self.data_path), new_model)
+
+    def get(self):
+        data_version = file_version(self.data_path)
+        current = self._current
+        if current is not None and current.data_version == data_version:
+            return current
+
+        with self._lock:
+            # Another session may have rebuilt while we waited for the lock
+            current = self._current
+            if current is None or current.data_version != data_version:
+                current = self._build(data_version, self.registry.current())
+                self._current = current
+            return current
+
+    def reload(self):
+        """
+        Reload the model from disk and rebuild the snapshot.
+        """
+        if not self.registry.check(force=True):
+            with self._lock:
+                self._current = self._build(file_version(self.data_path), self.registry.current())
+        return self._current
+
+    @property
+    def version(self):
+        current = self._current
+        return None if current is None else (current.data_version, current.model_version)
+
+
+def get_resource_manager():
+    """
+    The process-wide ResourceManager shared by every Streamlit session; its
+    model registry starts watching for new models on first use.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ResourceManager()
+                _manager.registry.start()
+    return _manager
+
+
+def get_resources():
+    return get_resource_manager().get()
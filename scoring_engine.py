@@ -0,0 +1,351 @@
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import KLLSketch
+
+# Feature set the autoencoder was trained on
+FEATURES = ['Work_Duration', 'Idle_Time', 'File_Access_Frequency', 'VPN_Usage', 'Latitude', 'Longitude']
+
+DATA_PATH = r"Employee_Behaviour.csv"
+MODEL_PATH = r"autoencoder_model.keras"
+SCALER_PATH = r"autoencoder_scaler.json"
+
+# Bump when the layout of the scaler artifact changes
+SCALER_FORMAT_VERSION = 1
+
+# Rows pushed through the model per forward pass
+PREDICT_BATCH_SIZE = 8192
+
+# Population percentile of reconstruction error above which an employee is anomalous
+ANOMALY_PERCENTILE = float(os.environ.get('ANOMALY_PERCENTILE', 95))
+
+
+class LatestCache:
+    """
+    Memo that keeps only the value for the most recent key.
+
+    Keys are data/model versions, so a new key means the old value is stale
+    and it is dropped rather than kept around. The (key, value) pair is
+    replaced in one assignment, so concurrent readers never see a mismatch.
+    """
+
+    def __init__(self):
+        self._entry = None
+
+    def get_or_build(self, key, build):
+        entry = self._entry
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        value = build()
+        self._entry = (key, value)
+        return value
+
+
+# Scored populations keyed by (data_version, model_version)
+_score_cache = LatestCache()
+
+# Loaded scaler artifacts keyed by (path, file_version, model_path, model file_version)
+_scaler_cache = LatestCache()
+
+# Anomaly thresholds keyed by (data_version, model_version, percentile)
+_threshold_cache = LatestCache()
+
+# Error quantile sketches keyed by (data_version, model_version)
+_sketch_cache = LatestCache()
+
+# Sorted error distributions keyed by (data_version, model_version)
+_distribution_cache = LatestCache()
+
+# Row indexes keyed by data_version
+_index_cache = LatestCache()
+
+
+def file_version(path):
+    """
+    Cheap version token for a file on disk, derived from its size and mtime.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def file_sha256(path):
+    """
+    Content hash of a file, used to pin artifacts to the exact model they belong to.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureScaler:
+    """
+    Min-max scaling as a precomputed affine transform: X * scale + offset.
+
+    Equivalent to a fitted sklearn MinMaxScaler, but the parameters are frozen
+    so scores do not shift when unrelated rows are added to the dataset.
+    """
+
+    def __init__(self, data_min, data_max, features=FEATURES):
+        self.features = list(features)
+        self.data_min = np.asarray(data_min, dtype=np.float64)
+        self.data_max = np.asarray(data_max, dtype=np.float64)
+
+        # Constant features map to 0, matching MinMaxScaler
+        data_range = self.data_max - self.data_min
+        data_range[data_range == 0.0] = 1.0
+        self.scale = (1.0 / data_range).astype(np.float32)
+        self.offset = (-self.data_min / data_range).astype(np.float32)
+
+    @classmethod
+    def fit(cls, employee_df, features=FEATURES):
+        X = employee_df[features].to_numpy(dtype=np.float64)
+        return cls(X.min(axis=0), X.max(axis=0), features)
+
+    def transform(self, X, out=None):
+        """
+        Scaled float32 copy of X, written into out (shape (rows, features)) if given.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        out = np.multiply(X, self.scale, out=out)
+        out += self.offset
+        return out
+
+    def transform_frame(self, employee_df, out=None):
+        """
+        Scale the frame's features; with out, columns are copied straight into it
+        and scaled in place, so no intermediate matrix is allocated.
+        """
+        if out is None:
+            return self.transform(employee_df[self.features].to_numpy(dtype=np.float32))
+        for position, feature in enumerate(self.features):
+            out[:, position] = employee_df[feature].to_numpy(dtype=np.float32)
+        return self.transform(out, out)
+
+
+def save_scaler(scaler, path=SCALER_PATH, model_path=MODEL_PATH):
+    """
+    Write the scaler parameters as a JSON artifact pinned to the model file's hash.
+    """
+    artifact = {
+        'format_version': SCALER_FORMAT_VERSION,
+        'model_sha256': file_sha256(model_path),
+        'features': scaler.features,
+        'data_min': scaler.data_min.tolist(),
+        'data_max': scaler.data_max.tolist()
+    }
+    with open(path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+
+
+def load_scaler(path=SCALER_PATH, model_path=MODEL_PATH):
+    """
+    Load the scaler artifact shipped alongside the model, memoized per scaler
+    and model file version so a replaced model is always checked against the pin.
+
+    Raises ValueError if the artifact was produced for a different model or feature set.
+    """
+    key = (path, file_version(path), model_path, file_version(model_path))
+    return _scaler_cache.get_or_build(key, lambda: _read_scaler(path, model_path))
+
+
+def _read_scaler(path, model_path):
+    with open(path) as f:
+        artifact = json.load(f)
+
+    if artifact.get('format_version') != SCALER_FORMAT_VERSION:
+        raise ValueError(f"Unsupported scaler artifact version in {path}: {artifact.get('format_version')}")
+    if artifact['features'] != FEATURES:
+        raise ValueError(f"Scaler artifact {path} was fitted on {artifact['features']}, expected {FEATURES}")
+    if artifact['model_sha256'] != file_sha256(model_path):
+        raise ValueError(f"Scaler artifact {path} does not belong to {model_path}; re-export it")
+
+    return FeatureScaler(artifact['data_min'], artifact['data_max'], artifact['features'])
+
+
+def reconstruction_error(X_scaled, autoencoder):
+    """
+    Mean squared reconstruction error for every row of an already scaled feature matrix.
+    """
+    reconstructed = autoencoder.predict(X_scaled, batch_size=PREDICT_BATCH_SIZE, verbose=0)
+    return np.mean(np.power(X_scaled - reconstructed, 2), axis=1)
+
+
+def error_sketch(errors, data_version, model_version):
+    """
+    KLLSketch of the population's reconstruction errors for a data/model
+    version. Live feeds copy it and keep adding to it.
+    """
+    return _sketch_cache.get_or_build((data_version, model_version), lambda: KLLSketch().update(errors))
+
+
+def anomaly_threshold(errors, data_version, model_version, percentile=ANOMALY_PERCENTILE):
+    """
+    Population-level anomaly threshold: the given percentile of reconstruction
+    error over every scored employee, read from the version's error sketch.
+    """
+    return _threshold_cache.get_or_build(
+        (data_version, model_version, percentile),
+        lambda: error_sketch(errors, data_version, model_version).quantile(percentile)
+    )
+
+
+def score_population(employee_df, autoencoder, scaler, data_version, model_version):
+    """
+    Score every employee in a single vectorized pass through the autoencoder.
+
+    Returns a copy of employee_df sorted by Department with Reconstruction_Error
+    and Is_Anomaly columns added. The result is cached per (data_version,
+    model_version) so repeated lookups never touch the model again.
+    """
+    return _score_cache.get_or_build(
+        (data_version, model_version),
+        lambda: _score_population(employee_df, autoencoder, scaler, data_version, model_version)
+    )
+
+
+def _score_population(employee_df, autoencoder, scaler, data_version, model_version):
+    # Scale features with the frozen training parameters
+    X_scaled = scaler.transform_frame(employee_df)
+
+    # Predict and calculate reconstruction error for the whole population
+    mse = reconstruction_error(X_scaled, autoencoder)
+
+    # Flag everything above the population threshold as anomalous
+    threshold = anomaly_threshold(mse, data_version, model_version)
+
+    # Sort by department (in order of first appearance) so each department is a contiguous row slice
+    departments = employee_df['Department'].astype(str)
+    codes = pd.Categorical(departments, categories=pd.unique(departments)).codes
+    order = np.argsort(codes, kind='stable')
+    return employee_df.assign(
+        Reconstruction_Error=mse,
+        Is_Anomaly=mse > threshold
+    ).iloc[order].reset_index(drop=True)
+
+
+class PopulationIndex:
+    """
+    Department -> row slice, Role -> row positions and Employee_ID -> row
+    position over a scored, department-sorted frame, so views never need a
+    boolean-mask scan.
+    """
+
+    def __init__(self, scored):
+        departments = scored['Department'].to_numpy()
+        starts = np.concatenate(([0], np.flatnonzero(departments[1:] != departments[:-1]) + 1))
+        stops = np.append(starts[1:], len(scored))
+        self.department_slices = {departments[start]: slice(start, stop) for start, stop in zip(starts, stops)}
+        self.department_names = list(self.department_slices)
+        self.role_positions = {role: positions for role, positions
+                               in scored.groupby(scored['Role'].astype(str), sort=True).indices.items()}
+        self.role_names = list(self.role_positions)
+        # An employee with several sessions maps to their first row, as a .iloc[0] lookup would
+        first = ~scored['Employee_ID'].duplicated().to_numpy()
+        self.positions = dict(zip(scored['Employee_ID'].to_numpy()[first], np.flatnonzero(first).tolist()))
+
+    def department_rows(self, scored, department):
+        return scored.iloc[self.department_slices.get(department, slice(0, 0))]
+
+    def group_positions(self, department=None, role=None):
+        """
+        Row positions in a department and/or role (every row if neither is given), in row order.
+        """
+        positions = None
+        if department is not None:
+            rows = self.department_slices.get(department, slice(0, 0))
+            positions = np.arange(rows.start, rows.stop)
+        if role is not None:
+            role_rows = self.role_positions.get(role, np.empty(0, dtype=np.int64))
+            if positions is None:
+                positions = role_rows
+            else:
+                # Role positions are sorted, so the department's share is a contiguous run
+                positions = role_rows[np.searchsorted(role_rows, rows.start):np.searchsorted(role_rows, rows.stop)]
+        return positions
+
+    def employee_position(self, employee_id):
+        return self.positions.get(employee_id)
+
+    def employee_rows(self, scored, employee_id):
+        """
+        The employee's row as a one-row frame (empty if the ID is unknown).
+        """
+        position = self.positions.get(employee_id)
+        if position is None:
+            return scored.iloc[0:0]
+        return scored.iloc[position:position + 1]
+
+
+def population_index(scored, data_version):
+    return _index_cache.get_or_build(data_version, lambda: PopulationIndex(scored))
+
+
+class ErrorDistribution:
+    """
+    Sorted reconstruction errors for the whole population and for each
+    department, so a percentile rank is a binary search instead of a
+    percentile computation.
+    """
+
+    def __init__(self, scored, index):
+        errors = scored['Reconstruction_Error'].to_numpy()
+        self.overall = np.sort(errors)
+        self.departments = {department: np.sort(errors[rows]) for department, rows in index.department_slices.items()}
+
+    def percentile_rank(self, error, department=None):
+        """
+        Percentage of employees (in the department, if given) with error <= error.
+        """
+        sorted_errors = self.overall if department is None else self.departments.get(department)
+        if sorted_errors is None or not len(sorted_errors):
+            return float('nan')
+        return 100.0 * np.searchsorted(sorted_errors, error, side='right') / len(sorted_errors)
+
+
+def error_distribution(scored, index, data_version, model_version):
+    return _distribution_cache.get_or_build((data_version, model_version), lambda: ErrorDistribution(scored, index))
+
+
+def top_risk(scored, index, k=10, department=None, role=None):
+    """
+    The k highest-error employees, overall or within a department and/or role,
+    highest first. Uses a partial selection (argpartition) so only the k
+    winners are ever sorted.
+    """
+    errors = scored['Reconstruction_Error'].to_numpy()
+    positions = index.group_positions(department, role)
+    if positions is not None:
+        errors = errors[positions]
+    k = min(k, len(errors))
+    if k == 0:
+        return scored.iloc[0:0]
+
+    top = np.argpartition(errors, len(errors) - k)[len(errors) - k:]
+    top = top[np.argsort(errors[top], kind='stable')[::-1]]
+    return scored.iloc[top if positions is None else positions[top]]
+
+
+def lookup_employee(scored, index, employee_id):
+    """
+    O(1) lookup of a single employee's scored row, or None if the ID is unknown.
+    """
+    position = index.employee_position(employee_id)
+    if position is None:
+        return None
+    return scored.iloc[position]
+
+
+if __name__ == "__main__":
+    # Usage: python scoring_engine.py export-scaler [data.csv]
+    if len(sys.argv) < 2 or sys.argv[1] != 'export-scaler':
+        sys.exit("usage: python scoring_engine.py export-scaler [data.csv]")
+    source = sys.argv[2] if len(sys.argv) > 2 else DATA_PATH
+    save_scaler(FeatureScaler.fit(pd.read_csv(source)))
+    print(f"Wrote {SCALER_PATH} from {source}")
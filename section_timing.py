@@ -0,0 +1,51 @@
+import functools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Recent runs kept per section for the timing summary
+TIMING_WINDOW = 200
+
+_timings = {}
+_timings_lock = threading.Lock()
+
+
+def timed_section(name):
+    """
+    Decorator recording the wall-clock time of every call under name. Put it
+    under @st.fragment so fragment-only reruns are measured too.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                with _timings_lock:
+                    _timings.setdefault(name, deque(maxlen=TIMING_WINDOW)).append(elapsed)
+
+        return wrapper
+
+    return decorate
+
+
+def section_stats():
+    """
+    {section: {'runs', 'last_ms', 'p50_ms', 'mean_ms'}} over the recent runs of each section.
+    """
+    with _timings_lock:
+        snapshot = {name: list(samples) for name, samples in _timings.items()}
+    return {
+        name: {
+            'runs': len(samples),
+            'last_ms': samples[-1],
+            'p50_ms': float(np.percentile(samples, 50)),
+            'mean_ms': float(np.mean(samples))
+        }
+        for name, samples in snapshot.items()
+    }
@@ -0,0 +1,211 @@
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+
+from data_ingest import SCHEMA, parse_frame
+from drift_monitor import DriftMonitor
+from quantile_sketch import KLLSketch
+from scoring_engine import ANOMALY_PERCENTILE, error_sketch, reconstruction_error
+
+KPI_COLUMNS = ['total', 'normal', 'suspicious', 'critical', 'access_anomalies', 'model_anomalies']
+
+# Live feeds keyed by (feed_path, data_version, model_version)
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+class FeedTailer:
+    """
+    Reads an append-only CSV or JSONL behaviour feed, returning only the rows
+    appended since the previous call. A trailing partial line is held back
+    until it is completed, and a truncated or rotated file (a new inode at the
+    same path) is re-read from the start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.is_jsonl = path.endswith(('.jsonl', '.ndjson'))
+        self.offset = 0
+        self.header = None
+        self.pending = b''
+        self.file_id = None
+        self.rejected_count = 0
+
+    def _reset(self):
+        self.offset = 0
+        self.header = None
+        self.pending = b''
+
+    def read_new(self):
+        """
+        Parse the bytes appended since the last call. Returns a typed frame, or None if nothing is new.
+        """
+        stat = os.stat(self.path)
+        size = stat.st_size
+        file_id = (stat.st_dev, stat.st_ino)
+        if size < self.offset or file_id != self.file_id:
+            self._reset()
+            self.file_id = file_id
+        if size == self.offset:
+            return None
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        # Only hand complete lines to the parser
+        data = self.pending + data
+        cut = data.rfind(b'\n') + 1
+        self.pending = data[cut:]
+        text = data[:cut].decode('utf-8-sig')
+
+        if self.is_jsonl:
+            records = []
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                # A malformed line is rejected like a row that fails the schema
+                if isinstance(record, dict):
+                    records.append(record)
+                else:
+                    self.rejected_count += 1
+            if not records:
+                return None
+            # Missing keys and JSON nulls become empty fields, which parse_frame rejects
+            raw = pd.DataFrame.from_records(records, columns=list(SCHEMA)).fillna('').astype(str)
+        else:
+            # Wait for the header line to be complete before taking it
+            if self.header is None and not text:
+                return None
+            if self.header is None:
+                header, _, text = text.partition('\n')
+                self.header = header.rstrip('\r')
+            if not text.strip():
+                return None
+            raw = pd.read_csv(io.StringIO(self.header + '\n' + text), dtype=str, keep_default_na=False)
+
+        rows, rejected = parse_frame(raw, self.path)
+        self.rejected_count += len(rejected)
+        return rows if len(rows) else None
+
+
+class DepartmentKPIs:
+    """
+    Per-department KPI counters that are updated from deltas instead of being
+    recomputed over the full history.
+    """
+
+    def __init__(self):
+        self.counts = pd.DataFrame(columns=KPI_COLUMNS, dtype='int64')
+
+    def update(self, scored_delta):
+        """
+        Add a batch of scored rows (with Is_Anomaly) to the counters.
+        """
+        label = scored_delta['Behavior_Label'].astype(str).to_numpy()
+        indicators = pd.DataFrame({
+            'total': 1,
+            'normal': label == 'Normal',
+            'suspicious': label == 'Suspicious',
+            'critical': label == 'Critical',
+            'access_anomalies': scored_delta['Access_Anomaly_Flag'].to_numpy(),
+            'model_anomalies': scored_delta['Is_Anomaly'].to_numpy()
+        }).astype('int64')
+        delta = indicators.groupby(scored_delta['Department'].astype(str).to_numpy()).sum()
+        self.counts = self.counts.add(delta, fill_value=0).astype('int64')
+
+    def get(self, department):
+        """
+        KPI values for one department, including the access anomaly rate in percent.
+        """
+        if department in self.counts.index:
+            kpis = self.counts.loc[department].to_dict()
+        else:
+            kpis = dict.fromkeys(KPI_COLUMNS, 0)
+        kpis['anomaly_rate'] = (kpis['access_anomalies'] / kpis['total']) * 100 if kpis['total'] else 0.0
+        return kpis
+
+
+class LiveFeed:
+    """
+    Tails a behaviour feed, scores only the newly appended rows, and keeps the
+    department KPIs current.
+
+    The anomaly threshold tracks the population as it grows: every scored
+    error goes into a KLLSketch (a copy of the base population's sketch) and
+    the threshold is re-read from it after each poll. Rows are flagged against the threshold
+    in force when they arrived. A DriftMonitor compares the feed's recent
+    feature values with the base population the model was trained on.
+    """
+
+    def __init__(self, feed_path, autoencoder, scaler, threshold, base_scored=None, sketch=None,
+                 percentile=ANOMALY_PERCENTILE):
+        self.tailer = FeedTailer(feed_path)
+        self.autoencoder = autoencoder
+        self.scaler = scaler
+        self.threshold = threshold
+        self.percentile = percentile
+        self.sketch = sketch if sketch is not None else KLLSketch()
+        self.drift = None
+        self.kpis = DepartmentKPIs()
+        self.polls = 0
+        self._lock = threading.Lock()
+        if base_scored is not None:
+            self.kpis.update(base_scored)
+            self.drift = DriftMonitor.from_frame(base_scored, scaler)
+
+    def poll(self):
+        """
+        Ingest whatever was appended since the last poll. Returns the scored delta or None.
+        """
+        with self._lock:
+            new_rows = self.tailer.read_new()
+            if new_rows is None:
+                return None
+
+            X_scaled = self.scaler.transform_frame(new_rows)
+            mse = reconstruction_error(X_scaled, self.autoencoder)
+            scored = new_rows.assign(
+                Reconstruction_Error=mse,
+                Is_Anomaly=mse > self.threshold
+            )
+            self.kpis.update(scored)
+            self.polls += 1
+            self.sketch.update(mse)
+            self.threshold = self.sketch.quantile(self.percentile)
+            if self.drift is not None:
+                self.drift.update(X_scaled)
+            return scored
+
+    @property
+    def version(self):
+        """
+        Number of polls that ingested rows; changes whenever the KPIs do.
+        """
+        return self.polls
+
+
+def open_live_feed(feed_path, autoencoder, scaler, threshold, base_scored, data_version, model_version):
+    """
+    Return the process-wide LiveFeed for a feed path, starting a fresh one
+    (seeded from base_scored) whenever the base data or model version changes.
+    """
+    key = (feed_path, data_version, model_version)
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            for stale in [k for k in _feeds if k[0] == feed_path]:
+                del _feeds[stale]
+            # Start from the base population's sketch instead of re-adding every base error
+            sketch = error_sketch(base_scored['Reconstruction_Error'].to_numpy(), data_version, model_version).copy()
+            feed = LiveFeed(feed_path, autoencoder, scaler, threshold, base_scored, sketch)
+            _feeds[key] = feed
+    return feed
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules live flat at the repository root and open their artifacts by relative path
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
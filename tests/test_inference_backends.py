@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from inference_backends import BACKENDS, NumpyBackend, available_backends, conformance, resolve_backend
+from scoring_engine import FEATURES
+
+
+def test_every_available_backend_conforms():
+    differences = conformance(rows=1_000)
+    assert set(differences) == set(available_backends())
+    assert all(diff <= 1e-5 for diff in differences.values())
+
+
+def test_conformance_raises_beyond_tolerance():
+    if len(available_backends()) < 2:
+        pytest.skip("needs a backend besides numpy")
+    with pytest.raises(ValueError, match="deviate from the NumPy reference"):
+        conformance(rows=100, atol=-1.0)
+
+
+def test_resolve_backend_takes_first_available():
+    assert resolve_backend('numpy') is NumpyBackend
+    with pytest.raises(ValueError, match="Unknown inference backend"):
+        resolve_backend('no-such-backend,numpy')
+
+
+@pytest.mark.parametrize('backend, precision', [('onnxruntime', 'int8'), ('tflite', 'float16'), ('tflite', 'int8')])
+def test_quantized_backends_stay_close_to_float32(backend, precision):
+    if not BACKENDS[backend].available():
+        pytest.skip(f"{backend} is not installed")
+    X = np.random.default_rng(0).random((1_000, len(FEATURES)), dtype=np.float32)
+    expected = NumpyBackend.load().predict(X)
+    actual = BACKENDS[backend].load(precision=precision).predict(X)
+    assert actual.shape == expected.shape
+    assert np.max(np.abs(actual - expected)) < 0.05
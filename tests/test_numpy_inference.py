@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from numpy_inference import load_numpy_model, verify_against_keras
+from scoring_engine import FEATURES
+
+
+def test_numpy_model_matches_keras():
+    pytest.importorskip('tensorflow')
+    assert verify_against_keras(rows=1_000) <= 1e-5
+
+
+def test_verify_raises_beyond_tolerance():
+    pytest.importorskip('tensorflow')
+    with pytest.raises(ValueError, match="deviates from Keras"):
+        verify_against_keras(rows=100, atol=-1.0)
+
+
+def test_numpy_model_output_shape_and_range():
+    X = np.random.default_rng(0).random((64, len(FEATURES)), dtype=np.float32)
+    reconstructed = load_numpy_model().predict(X)
+    assert reconstructed.shape == X.shape
+    # The output layer is a sigmoid
+    assert np.all((reconstructed >= 0) & (reconstructed <= 1))
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from numpy_inference import export_keras_archive
+from scoring_engine import DATA_PATH, FEATURES, MODEL_PATH, SCALER_PATH, FeatureScaler, load_scaler, save_scaler
+
+# Where published versions go; point the dashboard's MODEL_DIR here to hot-reload them
+PUBLISH_DIR = os.environ.get('MODEL_DIR', 'models')
+
+BATCH_SIZE = 4096
+SHUFFLE_BUFFER = 100_000
+
+
+def feature_columns(csv_path):
+    """
+    Positions of FEATURES in the CSV header (the BOM on the first column is ignored).
+    """
+    with open(csv_path, encoding='utf-8-sig') as f:
+        header = f.readline().strip().split(',')
+    missing = [feature for feature in FEATURES if feature not in header]
+    if missing:
+        raise ValueError(f"{csv_path} is missing feature columns: {missing}")
+    return [header.index(feature) for feature in FEATURES]
+
+
+def raw_feature_rows(paths):
+    """
+    tf.data pipeline of raw feature rows in FEATURES order, taken from the CSVs
+    in turn. Each file's header is read separately, so inputs may order their
+    columns differently. Malformed rows are skipped.
+    """
+    import tensorflow as tf
+
+    def read(path):
+        indices = feature_columns(path)
+        select_cols = sorted(indices)
+        record_defaults = [tf.string if FEATURES[indices.index(i)] == 'VPN_Usage' else tf.float32 for i in select_cols]
+        positions = [select_cols.index(i) for i in indices]
+
+        def to_row(*columns):
+            values = []
+            for position in positions:
+                column = columns[position]
+                if column.dtype == tf.string:
+                    column = tf.cast(tf.strings.upper(tf.strings.strip(column)) == 'TRUE', tf.float32)
+                values.append(column)
+            return tf.stack(values)
+
+        return tf.data.experimental.CsvDataset(path, record_defaults, header=True, select_cols=select_cols)\
+            .ignore_errors()\
+            .map(to_row, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+
+    files = [read(path) for path in paths]
+    if len(files) == 1:
+        return files[0]
+    # Fixed round-robin over the files keeps the train/validation split stable across epochs;
+    # exhausted files are skipped until every file is done
+    order = tf.data.Dataset.range(len(files)).repeat()
+    return tf.data.Dataset.choose_from_datasets(files, order, stop_on_empty_dataset=False)
+
+
+def fit_scaler_streaming(paths, batch_size=BATCH_SIZE):
+    """
+    Min-max scaler fitted in one streaming pass, without loading the data into memory.
+    """
+    import tensorflow as tf
+
+    data_min = np.full(len(FEATURES), np.inf)
+    data_max = np.full(len(FEATURES), -np.inf)
+    for batch in raw_feature_rows(paths).batch(batch_size).prefetch(tf.data.AUTOTUNE).as_numpy_iterator():
+        data_min = np.minimum(data_min, batch.min(axis=0))
+        data_max = np.maximum(data_max, batch.max(axis=0))
+    return FeatureScaler(data_min, data_max)
+
+
+def training_datasets(paths, scaler, batch_size=BATCH_SIZE, validation_every=10, shuffle_buffer=SHUFFLE_BUFFER):
+    """
+    (train, validation) datasets of scaled (x, x) batches. Every validation_every-th
+    row is held out for validation; the held-out rows are cached in memory after
+    the first epoch, so later epochs only read the CSVs for the training rows.
+    """
+    import tensorflow as tf
+
+    scale = tf.constant(scaler.scale)
+    offset = tf.constant(scaler.offset)
+    rows = raw_feature_rows(paths).enumerate()
+
+    def scaled_pair(_, row):
+        x = row * scale + offset
+        return x, x
+
+    train = rows.filter(lambda i, _: i % validation_every != 0).map(scaled_pair, num_parallel_calls=tf.data.AUTOTUNE)
+    validation = rows.filter(lambda i, _: i % validation_every == 0).map(scaled_pair, num_parallel_calls=tf.data.AUTOTUNE)\
+        .cache()
+    train = train.shuffle(shuffle_buffer).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    validation = validation.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    return train, validation
+
+
+def build_autoencoder(hidden_units=3):
+    """
+    Same architecture as the shipped model: Dense(relu) bottleneck, Dense(sigmoid) reconstruction.
+    """
+    from tensorflow import keras
+
+    inputs = keras.Input(shape=(len(FEATURES),))
+    encoded = keras.layers.Dense(hidden_units, activation='relu')(inputs)
+    decoded = keras.layers.Dense(len(FEATURES), activation='sigmoid')(encoded)
+    return keras.Model(inputs, decoded)
+
+
+def _time_budget(deadline):
+    from tensorflow import keras
+
+    class TimeBudget(keras.callbacks.Callback):
+        """
+        Stop after the epoch during which the wall-clock deadline passes.
+        """
+
+        def on_epoch_end(self, epoch, logs=None):
+            if time.time() >= deadline:
+                self.model.stop_training = True
+
+    return TimeBudget()
+
+
+def publish(model, scaler, publish_dir, metadata):
+    """
+    Write model, scaler and NumPy export into publish_dir/<version>/. The files are
+    written to a dot-prefixed temp directory first and renamed into place, so
+    the model registry never sees a half-written version.
+    """
+    version = time.strftime('%Y%m%d-%H%M%S')
+    staging = os.path.join(publish_dir, f'.{version}.tmp')
+    os.makedirs(staging)
+
+    model_path = os.path.join(staging, os.path.basename(MODEL_PATH))
+    model.save(model_path)
+    save_scaler(scaler, os.path.join(staging, os.path.basename(SCALER_PATH)), model_path)
+    export_keras_archive(model_path, os.path.splitext(model_path)[0] + '.npz')
+    with open(os.path.join(staging, 'training.json'), 'w') as f:
+        json.dump(dict(metadata, version=version), f, indent=2)
+
+    final = os.path.join(publish_dir, version)
+    os.rename(staging, final)
+    return final
+
+
+def train(paths, base_model=MODEL_PATH, from_scratch=False, refit_scaler=False, epochs=50, patience=3,
+          batch_size=BATCH_SIZE, learning_rate=1e-3, max_minutes=None, publish_dir=PUBLISH_DIR):
+    """
+    Retrain the autoencoder on behaviour CSVs and publish a new version. Returns the published directory.
+    """
+    from tensorflow import keras
+
+    started = time.time()
+    if refit_scaler:
+        scaler = fit_scaler_streaming(paths, batch_size)
+    else:
+        # Use the scaler published next to the base model, as the model registry does
+        scaler = load_scaler(os.path.join(os.path.dirname(base_model), os.path.basename(SCALER_PATH)), base_model)
+    train_ds, validation_ds = training_datasets(paths, scaler, batch_size)
+
+    if from_scratch:
+        model = build_autoencoder()
+    else:
+        model = keras.models.load_model(base_model)
+    model.compile(optimizer=keras.optimizers.RMSprop(learning_rate=learning_rate), loss='mean_squared_error')
+
+    callbacks = [keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)]
+    if max_minutes:
+        callbacks.append(_time_budget(started + max_minutes * 60))
+    history = model.fit(train_ds, validation_data=validation_ds, epochs=epochs, callbacks=callbacks, verbose=2)
+
+    metadata = {
+        'sources': [os.path.abspath(path) for path in paths],
+        'warm_start_from': None if from_scratch else os.path.abspath(base_model),
+        'refit_scaler': refit_scaler,
+        'epochs_run': len(history.history['loss']),
+        'best_val_loss': float(min(history.history['val_loss'])),
+        'training_seconds': round(time.time() - started, 1)
+    }
+    return publish(model, scaler, publish_dir, metadata)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the behaviour autoencoder and publish a new version.")
+    parser.add_argument('inputs', nargs='*', default=[DATA_PATH], help="CSV files in Employee_Behaviour.csv format")
+    parser.add_argument('--base-model', default=MODEL_PATH, help="Model to warm-start from")
+    parser.add_argument('--from-scratch', action='store_true', help="Ignore the base model's weights")
+    parser.add_argument('--refit-scaler', action='store_true', help="Refit min/max scaling on the new data")
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--patience', type=int, default=3, help="Early-stopping patience in epochs")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--learning-rate', type=float, default=1e-3)
+    parser.add_argument('--max-minutes', type=float, default=None, help="Stop after this much wall-clock time")
+    parser.add_argument('--publish-dir', default=PUBLISH_DIR)
+    parser.add_argument('--detach', action='store_true', help="Run as a background job, logging to the publish dir")
+    args = parser.parse_args()
+
+    if args.detach:
+        os.makedirs(args.publish_dir, exist_ok=True)
+        log_path = os.path.join(args.publish_dir, 'train.log')
+        command = [sys.executable, os.path.abspath(__file__)] + [arg for arg in sys.argv[1:] if arg != '--detach']
+        with open(log_path, 'a') as log:
+            process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        print(f"Training started in the background (pid {process.pid}); logging to {log_path}")
+        return
+
+    os.makedirs(args.publish_dir, exist_ok=True)
+    published = train(args.inputs, args.base_model, args.from_scratch, args.refit_scaler, args.epochs,
+                      args.patience, args.batch_size, args.learning_rate, args.max_minutes, args.publish_dir)
+    print(f"Published {published}")
+
+
+if __name__ == "__main__":
+    main()